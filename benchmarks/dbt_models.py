@@ -0,0 +1,172 @@
+"""
+Benchmark the dbt models against synthetic data in a local Postgres.
+
+1. Generate `--days` of synthetic raw data and run the indicator stage.
+2. Full build:        dbt run --full-refresh
+3. Append `--incremental-days` more days, rerun the indicator stage.
+4. Incremental build: dbt run
+
+Per-model execution time (from run_results.json) and row counts are written to
+`--output`. The run fails (exit code 1) when a model exceeds its limit in
+`--thresholds`, or is slower than `--max-regression` x the time in `--baseline`.
+
+    python -m benchmarks.dbt_models --days 750 --tickers 50 --baseline last.json
+"""
+import argparse
+import datetime as dt
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from psycopg2 import sql
+
+from benchmarks.synthetic_data import (
+    PROTECTED_DATABASES, SyntheticMarket, bench_database, connect, ensure_database, insert_days, trading_days,
+)
+from include.tasks.compute_indicators import upsert_indicators
+from include.tasks.load_2_db import RANKED_LISTS_TABLE_NAME, TABLE_NAME, _ensure_ranked_lists_table, _ensure_table
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DBT_PROFILES_DIR = REPO_ROOT / "include" / "dbt"
+DBT_PROJECT_PATH = DBT_PROFILES_DIR / "my_project"
+DEFAULT_THRESHOLDS = Path(__file__).resolve().parent / "thresholds.json"
+
+
+def _reset(conn):
+    """Drop everything the benchmark creates so each run starts from an empty database."""
+    # Checked on the live connection too, whatever env var or argument produced it
+    if conn.info.dbname in PROTECTED_DATABASES:
+        raise RuntimeError(f"Refusing to drop schema public in protected database {conn.info.dbname}.")
+    with conn.cursor() as cur:
+        cur.execute("DROP SCHEMA IF EXISTS public CASCADE; CREATE SCHEMA public;")
+        _ensure_table(cur, TABLE_NAME)
+        _ensure_ranked_lists_table(cur, RANKED_LISTS_TABLE_NAME)
+    conn.commit()
+
+
+def run_indicators(conn):
+    """Run the indicator stage in-process and time it like a model."""
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        rows = upsert_indicators(cur)
+    conn.commit()
+    return {"seconds": round(time.perf_counter() - started, 3), "rows_written": rows}
+
+
+def run_dbt(full_refresh, target_path):
+    """Run dbt against the `bench` target and return per-model timings from run_results.json."""
+    cmd = [
+        "dbt", "run",
+        "--project-dir", str(DBT_PROJECT_PATH),
+        "--profiles-dir", str(DBT_PROFILES_DIR),
+        "--target", "bench",
+        "--target-path", str(target_path),
+    ]
+    if full_refresh:
+        cmd.append("--full-refresh")
+    env = {**os.environ, "DBT_SOURCE_DATABASE": bench_database()}
+
+    started = time.perf_counter()
+    result = subprocess.run(cmd, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        logging.error(result.stdout[-4000:])
+        raise RuntimeError(f"dbt run failed ({' '.join(cmd)})")
+
+    run_results = json.loads((Path(target_path) / "run_results.json").read_text())
+    models = {
+        r["unique_id"].split(".")[-1]: {"seconds": round(r["execution_time"], 3), "status": r["status"]}
+        for r in run_results["results"]
+    }
+    return {"seconds": round(elapsed, 3), "models": models}
+
+
+def add_row_counts(conn, phase):
+    """Attach the post-build row count to each model in a phase result."""
+    with conn.cursor() as cur:
+        for model, stats in phase["models"].items():
+            cur.execute(sql.SQL("SELECT count(*) FROM {}").format(sql.Identifier(model)))
+            stats["rows"] = cur.fetchone()[0]
+
+
+def check(results, thresholds, baseline=None, max_regression=None):
+    """
+    Compare model timings with absolute limits and, optionally, a previous run.
+    Returns:
+        list[str]: human readable failures (empty when everything is within limits)
+    """
+    failures = []
+    for phase in ("full", "incremental"):
+        limits = thresholds.get(phase, {})
+        previous = (baseline or {}).get(phase, {}).get("models", {})
+        for model, stats in results[phase]["models"].items():
+            limit = limits.get(model, limits.get("default"))
+            if limit is not None and stats["seconds"] > limit:
+                failures.append(f"{phase}/{model}: {stats['seconds']}s > limit {limit}s")
+            before = previous.get(model, {}).get("seconds")
+            # Ignore sub-second noise when comparing against the baseline
+            if max_regression and before and stats["seconds"] > max(before * max_regression, before + 1):
+                failures.append(f"{phase}/{model}: {stats['seconds']}s > {max_regression}x baseline {before}s")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=250, help="Trading days for the full build (default: 250)")
+    parser.add_argument("--incremental-days", type=int, default=1, help="Days appended before the incremental build (default: 1)")
+    parser.add_argument("--tickers", type=int, default=20, help="Tickers in each day's most_active list (default: 20)")
+    parser.add_argument("--bars", type=int, default=100, help="Daily bars per TIME_SERIES_DAILY payload (default: 100)")
+    parser.add_argument("--news-items", type=int, default=50, help="Articles per NEWS_SENTIMENT payload (default: 50)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--thresholds", type=Path, default=DEFAULT_THRESHOLDS, help="JSON of max seconds per phase/model")
+    parser.add_argument("--baseline", type=Path, default=None, help="Previous --output file to compare against")
+    parser.add_argument("--max-regression", type=float, default=1.5, help="Allowed slowdown vs. baseline (default: 1.5x)")
+    parser.add_argument("--output", type=Path, default=Path("dbt_benchmark_results.json"))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    # The incremental days are the tail of the calendar, so the market is built once over both phases
+    all_days = trading_days(dt.date.today(), args.days + args.incremental_days)
+    market = SyntheticMarket(args.tickers, all_days, args.bars, seed=args.seed)
+    full_days, incremental_days = all_days[:args.days], all_days[args.days:]
+
+    ensure_database()
+    conn = connect()
+    target_path = REPO_ROOT / "include" / "dbt" / "my_project" / "target" / "benchmark"
+    results = {
+        "scale": {k: getattr(args, k) for k in ("days", "incremental_days", "tickers", "bars", "news_items")},
+    }
+    try:
+        _reset(conn)
+        insert_days(conn, market, full_days, args.tickers, args.news_items)
+        results["full"] = {"indicators": run_indicators(conn), **run_dbt(True, target_path)}
+        add_row_counts(conn, results["full"])
+
+        insert_days(conn, market, incremental_days, args.tickers, args.news_items)
+        results["incremental"] = {"indicators": run_indicators(conn), **run_dbt(False, target_path)}
+        add_row_counts(conn, results["incremental"])
+    finally:
+        conn.close()
+
+    args.output.write_text(json.dumps(results, indent=2))
+    logging.info("Wrote results to %s", args.output)
+    for phase in ("full", "incremental"):
+        logging.info("%s build: %ss", phase, results[phase]["seconds"])
+        for model, stats in sorted(results[phase]["models"].items()):
+            logging.info("  %-28s %8.3fs %10d rows", model, stats["seconds"], stats["rows"])
+
+    thresholds = json.loads(args.thresholds.read_text()) if args.thresholds.exists() else {}
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    failures = check(results, thresholds, baseline, args.max_regression)
+    for failure in failures:
+        logging.error("Regression: %s", failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Local stand-in for the Alpha Vantage API.
+
+Serves TOP_GAINERS_LOSERS, TIME_SERIES_DAILY, NEWS_SENTIMENT and OVERVIEW payloads built by
+benchmarks.synthetic_data, with configurable latency, error rate and throttling:
+
+    python -m benchmarks.mock_alpha_vantage --port 8765 --latency-ms 150 --error-rate 0.02 --rate-limit 75
+
+Point the `stock_api` connection at it, e.g.
+    AIRFLOW_CONN_STOCK_API='{"conn_type": "http", "host": "http://localhost:8765/query", "password": "demo"}'
+"""
+import argparse
+import datetime as dt
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.synthetic_data import SyntheticMarket, trading_days
+
+RATE_LIMIT_MESSAGE = (
+    "Thank you for using Alpha Vantage! Please consider spreading out your free API requests "
+    "more sparingly (1 request per second). You may subscribe to any of the premium plans to "
+    "lift the free key rate limit."
+)
+
+
+class MockAlphaVantage:
+    """
+    Request handler state: payload generation, latency, failure injection and a sliding-window rate limit.
+
+    Args:
+        tickers (int): size of each ranked list in TOP_GAINERS_LOSERS
+        bars (int): daily bars per TIME_SERIES_DAILY payload
+        news_items (int): articles per NEWS_SENTIMENT payload
+        latency_ms / jitter_ms (float): response delay, uniform in latency +/- jitter
+        error_rate (float): share of requests answered with HTTP 500
+        throttle_rate (float): share of requests answered with a rate-limit message, regardless of quota
+        rate_limit (int): requests per minute before throttling (0 disables)
+        throttle_style (str): 'information' (HTTP 200 + message, like Alpha Vantage) or '429'
+    """
+
+    def __init__(self, tickers=20, bars=100, news_items=50, latency_ms=0.0, jitter_ms=0.0,
+                 error_rate=0.0, throttle_rate=0.0, rate_limit=0, throttle_style="information", seed=0):
+        # The market calendar only has weekdays; on weekends serve the last trading day
+        self.day = trading_days(dt.date.today(), 1)[0]
+        self.market = SyntheticMarket(tickers, [self.day], bars, seed=seed)
+        self.tickers = tickers
+        self.news_items = news_items
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.throttle_style = throttle_style
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.recent = deque()
+        self.stats = Counter()
+        self._top = None
+
+    def _count(self, *keys):
+        with self.lock:
+            self.stats.update(keys)
+
+    def _throttled(self):
+        """Sliding one-minute window; also applies the random throttle rate."""
+        now = time.monotonic()
+        with self.lock:
+            while self.recent and now - self.recent[0] > 60:
+                self.recent.popleft()
+            if self.rate_limit and len(self.recent) >= self.rate_limit:
+                return True
+            self.recent.append(now)
+            return self.rng.random() < self.throttle_rate
+
+    def _payload(self, function, params):
+        symbol = params.get("symbol") or params.get("tickers", "")
+        with self.lock:
+            if function == "TOP_GAINERS_LOSERS":
+                if self._top is None:
+                    self._top = self.market.top_gainers_losers(self.day, self.tickers)
+                return self._top
+            if function == "TIME_SERIES_DAILY":
+                return self.market.time_series_daily(self._known(symbol), self.day)
+            if function == "NEWS_SENTIMENT":
+                payload = self.market.news_sentiment(self._known(symbol.split(",")[0]), self.day, self.news_items)
+                # 'YYYYMMDDTHHMM' compares as a prefix of time_published ('YYYYMMDDTHHMMSS')
+                time_from = params.get("time_from", "")
+                feed = [a for a in payload["feed"] if a["time_published"] >= time_from]
+                return {**payload, "items": str(len(feed)), "feed": feed}
+            if function == "OVERVIEW":
+                return self.market.overview(self._known(symbol))
+        return {"Error Message": f"Invalid API call: unknown function {function}"}
+
+    def _known(self, symbol):
+        # Unknown tickers get a deterministic series so any symbol works
+        if symbol not in self.market.series:
+            self.market.series[symbol] = self.market._walk()
+        return symbol
+
+    def handle(self, params):
+        """
+        Returns:
+            tuple[int, dict, dict]: (HTTP status, extra headers, JSON payload)
+        """
+        function = params.get("function", "")
+        self._count("calls", f"calls.{function}")
+
+        delay = self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        if self._throttled():
+            self._count("throttled")
+            if self.throttle_style == "429":
+                return 429, {"Retry-After": "60"}, {"Information": RATE_LIMIT_MESSAGE}
+            return 200, {}, {"Information": RATE_LIMIT_MESSAGE}
+        if self.rng.random() < self.error_rate:
+            self._count("errors")
+            return 500, {}, {"Error Message": "Injected server error"}
+        return 200, {}, self._payload(function, params)
+
+
+def _handler_for(mock):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/stats":
+                status, headers, payload = 200, {}, dict(mock.stats)
+            else:
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                try:
+                    status, headers, payload = mock.handle(params)
+                except Exception as e:
+                    # Answer like a failing server instead of dropping the connection
+                    logging.exception("Mock failed to handle %s", params)
+                    mock._count("errors")
+                    status, headers, payload = 500, {}, {"Error Message": f"Mock error: {e}"}
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logging.debug(format, *args)
+
+    return Handler
+
+
+def serve(mock, host="127.0.0.1", port=8765):
+    """Start the mock in a daemon thread. Returns the server (call .shutdown() to stop)."""
+    server = ThreadingHTTPServer((host, port), _handler_for(mock))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logging.info("Mock Alpha Vantage listening on http://%s:%d/query", host, server.server_address[1])
+    return server
+
+
+def add_mock_arguments(parser):
+    """CLI options shared with the pipeline benchmark."""
+    parser.add_argument("--tickers", type=int, default=20, help="Size of each TOP_GAINERS_LOSERS list (default: 20)")
+    parser.add_argument("--bars", type=int, default=100, help="Bars per TIME_SERIES_DAILY payload (default: 100)")
+    parser.add_argument("--news-items", type=int, default=50, help="Articles per NEWS_SENTIMENT payload (default: 50)")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Mean response latency (default: 100)")
+    parser.add_argument("--jitter-ms", type=float, default=50.0, help="Latency jitter (default: 50)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of HTTP 500 responses (default: 0)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of random rate-limit responses (default: 0)")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Requests per minute before throttling, 0 = unlimited")
+    parser.add_argument("--throttle-style", choices=["information", "429"], default="information")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def mock_from_args(args):
+    return MockAlphaVantage(
+        tickers=args.tickers, bars=args.bars, news_items=args.news_items,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate, rate_limit=args.rate_limit,
+        throttle_style=args.throttle_style, seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    server = serve(mock_from_args(args), args.host, args.port)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
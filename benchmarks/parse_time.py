@@ -0,0 +1,157 @@
+"""
+Benchmark the import cost of parsing the DAG files, the way the DAG processor does on every cycle.
+
+Each DAG file is executed in its own fresh interpreter after the framework (Airflow SDK,
+cosmos) has been imported, so the reported time is what that DAG file itself adds and no
+DAG file benefits from modules another one imported. The run also lists the heavy libraries
+that should only load inside tasks: those present after parsing (including any the framework
+pulled in) and, separately, those added by the DAG file itself:
+
+    python -m benchmarks.parse_time --repeat 5
+    python -m benchmarks.parse_time --importtime 15 --fail-on-heavy --output parse.json
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DAGS_FOLDER = REPO_ROOT / "dags"
+
+# Imported by every DAG parse anyway; measured separately as the baseline
+FRAMEWORK_IMPORTS = [
+    "airflow.sdk",
+    "airflow.providers.standard.operators.empty",
+    "cosmos",
+    "cosmos.profiles.postgres",
+]
+
+# Libraries only task execution needs
+HEAVY_MODULES = [
+    "pandas",
+    "pandas_market_calendars",
+    "numpy",
+    "requests",
+    "minio",
+    "psycopg2",
+    "google.cloud.storage",
+    "slack_sdk",
+    "airflow.providers.slack.notifications.slack",
+    "airflow.providers.common.sql.operators.sql",
+]
+
+# Runs in the child interpreter: import the framework, then time one DAG file
+_PROBE = """
+import importlib, importlib.util, json, sys, time
+framework, dag_file, heavy = json.loads(sys.argv[1])
+started = time.perf_counter()
+for name in framework:
+    importlib.import_module(name)
+framework_seconds = time.perf_counter() - started
+before = set(sys.modules)
+started = time.perf_counter()
+spec = importlib.util.spec_from_file_location("dag_under_test", dag_file)
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+seconds = time.perf_counter() - started
+loaded = set(sys.modules) - before
+print(json.dumps({
+    "framework_seconds": framework_seconds,
+    "framework_heavy": sorted(m for m in heavy if m in before),
+    "seconds": seconds,
+    "modules_loaded": len(loaded),
+    "heavy_loaded": sorted(m for m in heavy if m in loaded),
+    "heavy_present": sorted(m for m in heavy if m in sys.modules),
+}))
+"""
+
+
+def _env():
+    return {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(REPO_ROOT), os.getenv("PYTHONPATH")]))}
+
+
+def probe(dag_file):
+    """Parse one DAG file in a fresh interpreter."""
+    args = json.dumps([FRAMEWORK_IMPORTS, str(dag_file), HEAVY_MODULES])
+    result = subprocess.run([sys.executable, "-c", _PROBE, args], cwd=REPO_ROOT, env=_env(),
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Parsing failed:\n{result.stderr[-4000:]}")
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def import_profile(dag_file, top):
+    """Top `top` packages by cumulative import time (python -X importtime) when parsing dag_file."""
+    code = f"import runpy; runpy.run_path({str(dag_file)!r})"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=REPO_ROOT, env=_env(),
+                            capture_output=True, text=True)
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        # "import time:   self [us] |  cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2][1:]
+        # Only count top-level imports (no extra indentation) so nested packages are not double counted
+        if name and not name[0].isspace():
+            package = name.strip().split(".")[0]
+            cumulative[package] = cumulative.get(package, 0) + int(parts[1])
+    ranked = sorted(cumulative.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return [{"package": p, "seconds": round(us / 1e6, 4)} for p, us in ranked]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dags-folder", type=Path, default=DAGS_FOLDER)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per measurement (default: 5)")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N",
+                        help="Also report the N most expensive packages imported while parsing each DAG")
+    parser.add_argument("--fail-on-heavy", action="store_true",
+                        help="Exit 1 if any heavy library is loaded after parsing, by the DAG file or the framework")
+    parser.add_argument("--output", type=Path, default=None, help="Write the results as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    dag_files = sorted(args.dags_folder.glob("*.py"))
+
+    # Every DAG file gets its own interpreters, so none inherits another one's imports
+    runs = {path: [probe(path) for _ in range(args.repeat)] for path in dag_files}
+    all_runs = [r for path_runs in runs.values() for r in path_runs]
+    results = {
+        "framework_seconds": round(statistics.median(r["framework_seconds"] for r in all_runs), 4),
+        "framework_heavy": all_runs[-1]["framework_heavy"] if all_runs else [],
+        "dags": {},
+    }
+    for path, path_runs in runs.items():
+        last = path_runs[-1]
+        results["dags"][path.name] = {
+            "seconds": round(statistics.median(r["seconds"] for r in path_runs), 4),
+            "modules_loaded": last["modules_loaded"],
+            "heavy_loaded": last["heavy_loaded"],
+            "heavy_present": last["heavy_present"],
+        }
+        if args.importtime:
+            results["dags"][path.name]["import_profile"] = import_profile(path, args.importtime)
+
+    logging.info("Framework imports (%s): %.3fs  heavy: %s", ", ".join(FRAMEWORK_IMPORTS),
+                 results["framework_seconds"], ", ".join(results["framework_heavy"]) or "none")
+    for name, stats in results["dags"].items():
+        logging.info("%-28s %8.3fs %5d modules  heavy added: %s  heavy present: %s", name, stats["seconds"],
+                     stats["modules_loaded"], ", ".join(stats["heavy_loaded"]) or "none",
+                     ", ".join(stats["heavy_present"]) or "none")
+        for entry in stats.get("import_profile", []):
+            logging.info("    %-32s %8.4fs", entry["package"], entry["seconds"])
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    heavy = {name: s["heavy_present"] for name, s in results["dags"].items() if s["heavy_present"]}
+    if heavy:
+        logging.warning("Heavy libraries loaded after parsing (DAG file or framework): %s", heavy)
+    sys.exit(1 if args.fail_on_heavy and heavy else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+End-to-end throughput benchmark: extract_stock_info -> object storage -> load_2_db -> indicators -> dbt.
+
+Drives the real task functions against the local Alpha Vantage stand-in
+(benchmarks.mock_alpha_vantage), the local filesystem storage backend (or a local MinIO) and,
+with --load, the benchmark Postgres and the dbt `bench` target. Reports per-stage throughput,
+API calls per second and end-to-end latency:
+
+    python -m benchmarks.pipeline --top-n 3 --concurrency 3 --latency-ms 150 --rate-limit 75
+    python -m benchmarks.pipeline --storage minio --load --output pipeline.json
+
+Per-ticker units run on a thread pool sized like api_pool. Throttling waits follow
+AlphaVantageExtractOperator's backoff (scaled by --wait-scale so a run stays short), and
+failures are retried like the mapped tasks' `retries`.
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pendulum
+
+from benchmarks.mock_alpha_vantage import add_mock_arguments, mock_from_args, serve
+
+# run_unit is called from pool threads that share one counters dict
+_COUNTERS_LOCK = threading.Lock()
+
+
+def _use_storage(storage, storage_dir, bucket_prefix):
+    """
+    Select the object storage backend every task module resolves through get_storage().
+    Bucket names get bucket_prefix, so "bronze" becomes e.g. "bench-bronze" and a run never
+    touches the production day folders.
+    """
+    from include.connection.storage import LOCAL_STORAGE_ROOT_ENV, STORAGE_BACKEND_ENV, STORAGE_BUCKET_PREFIX_ENV
+
+    os.environ[STORAGE_BACKEND_ENV] = storage
+    os.environ[STORAGE_BUCKET_PREFIX_ENV] = bucket_prefix
+    if storage == "local":
+        os.environ[LOCAL_STORAGE_ROOT_ENV] = str(storage_dir)
+    # "minio" uses the real client, configured through AIRFLOW_CONN_MINIO
+
+
+def _use_bench_postgres():
+    """
+    Point the postgres_stock connection at the bench database, overriding any existing value.
+    Raises RuntimeError if the connection still resolves to a protected database (e.g. a
+    secrets backend that takes precedence over environment variables).
+    """
+    from airflow.sdk.bases.hook import BaseHook
+    from benchmarks.synthetic_data import PROTECTED_DATABASES, bench_database
+
+    os.environ["AIRFLOW_CONN_POSTGRES_STOCK"] = json.dumps({
+        "conn_type": "postgres",
+        "host": os.getenv("BENCH_PG_HOST", "localhost"),
+        "port": int(os.getenv("BENCH_PG_PORT", "5000")),
+        "login": os.getenv("POSTGRES_USER", "postgres"),
+        "password": os.getenv("POSTGRES_PASSWORD", "postgres"),
+        "schema": bench_database(),
+    })
+    resolved = BaseHook.get_connection("postgres_stock").schema
+    if resolved in PROTECTED_DATABASES:
+        raise RuntimeError(f"postgres_stock resolves to protected database {resolved}; refusing to load.")
+
+
+def _count(counters, key):
+    with _COUNTERS_LOCK:
+        counters[key] += 1
+
+
+def _timed(results, stage, units, fn):
+    started = time.perf_counter()
+    value = fn()
+    seconds = time.perf_counter() - started
+    results[stage] = {
+        "seconds": round(seconds, 3),
+        "units": units,
+        "units_per_second": round(units / seconds, 2) if seconds else None,
+    }
+    return value
+
+
+def run_unit(endpoint, unit, retries, max_waits, wait_scale, counters):
+    """Run one ticker x endpoint unit with the operator's throttling backoff and the task's retries."""
+    from airflow.exceptions import AirflowException
+    from include.tasks.extract_stock_info import ApiThrottled, extract_ticker_endpoint
+
+    for attempt in range(retries + 1):
+        waits = 0
+        try:
+            while True:
+                try:
+                    return extract_ticker_endpoint(endpoint, unit)
+                except ApiThrottled as e:
+                    if waits >= max_waits:
+                        raise
+                    _count(counters, "throttle_waits")
+                    time.sleep(e.retry_after * 2 ** waits * wait_scale)
+                    waits += 1
+        except AirflowException:
+            if attempt == retries:
+                raise
+            _count(counters, "retries")
+            time.sleep(60 * wait_scale)
+
+
+def run_most_active(folder_path, args, context, counters, extract_most_active_stocks):
+    """TOP_GAINERS_LOSERS with the task's retry policy (Airflow retries with backoff in the DAG)."""
+    from airflow.exceptions import AirflowException
+
+    for attempt in range(args.retries + 1):
+        try:
+            return extract_most_active_stocks(folder_path, top_n=args.top_n, **context)
+        except AirflowException:
+            if attempt == args.retries:
+                raise
+            _count(counters, "retries")
+            time.sleep(60 * 2 ** attempt * args.wait_scale)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_mock_arguments(parser)
+    parser.add_argument("--api-url", default=None, help="Use an already running API instead of the in-process mock")
+    parser.add_argument("--port", type=int, default=0, help="Port for the in-process mock (default: any free port)")
+    parser.add_argument("--top-n", type=int, default=3, help="Tickers extracted per day (default: 3)")
+    parser.add_argument("--concurrency", type=int, default=3, help="Parallel per-ticker units, like api_pool slots (default: 3)")
+    parser.add_argument("--retries", type=int, default=2, help="Retries per unit (default: 2)")
+    parser.add_argument("--max-throttle-waits", type=int, default=5)
+    parser.add_argument("--wait-scale", type=float, default=0.01, help="Scale for backoff/retry sleeps (default: 0.01)")
+    parser.add_argument("--storage", choices=["local", "minio"], default="local")
+    parser.add_argument("--storage-dir", type=Path, default=None, help="Local storage root (default: temp dir)")
+    parser.add_argument("--bucket-prefix", default="bench-",
+                        help="Prefix for bucket names, so 'bronze' becomes 'bench-bronze' (default: bench-)")
+    parser.add_argument("--load", action="store_true",
+                        help="Also run load_2_db, the indicator stage and dbt against the bench Postgres")
+    parser.add_argument("--output", type=Path, default=None, help="Write the results as JSON")
+    args = parser.parse_args()
+    if args.storage == "minio" and not args.bucket_prefix:
+        parser.error("--storage minio needs a non-empty --bucket-prefix; the unprefixed bronze bucket is production data")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    server = None
+    if args.api_url is None:
+        mock = mock_from_args(args)
+        server = serve(mock, port=args.port)
+        args.api_url = f"http://127.0.0.1:{server.server_address[1]}/query"
+    else:
+        mock = None
+    # Always overridden, so a run can never spend real API quota
+    os.environ["AIRFLOW_CONN_STOCK_API"] = json.dumps({"conn_type": "http", "host": args.api_url, "password": "demo"})
+    if args.load:
+        _use_bench_postgres()
+
+    storage_dir = args.storage_dir or Path(tempfile.mkdtemp(prefix="bronze-"))
+    _use_storage(args.storage, storage_dir, args.bucket_prefix)
+
+    from include.tasks.checking_b4_extraction import create_today_folder
+    from include.tasks.extract_stock_info import ENDPOINTS, extract_most_active_stocks
+
+    results = {"stages": {}, "config": {k: str(v) for k, v in vars(args).items()}}
+    stages = results["stages"]
+    counters = {"throttle_waits": 0, "retries": 0}
+    context = {"ds": pendulum.today("America/New_York").to_date_string()}
+
+    started = time.perf_counter()
+    try:
+        folder_path = _timed(stages, "create_today_folder", 1, create_today_folder)
+        outputs = _timed(stages, "extract_most_active_stocks", 1, lambda: run_most_active(
+            folder_path, args, context, counters, extract_most_active_stocks))
+
+        work = [(endpoint, unit) for endpoint in ENDPOINTS for unit in outputs]
+
+        def extract_all():
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                futures = [
+                    pool.submit(run_unit, endpoint, unit, args.retries,
+                                args.max_throttle_waits, args.wait_scale, counters)
+                    for endpoint, unit in work
+                ]
+                return [f.result() for f in futures]
+
+        _timed(stages, "extract_per_ticker", len(work), extract_all)
+
+        if args.load:
+            from benchmarks.dbt_models import DBT_PROJECT_PATH, run_dbt
+            from benchmarks.synthetic_data import ensure_database
+            from include.tasks.compute_indicators import compute_indicators
+            from include.tasks.load_2_db import load_2_db_biz_lookup, load_ranked_lists, load_to_db
+
+            ensure_database()
+            _timed(stages, "load_to_db", 1, lambda: load_to_db(**context))
+            _timed(stages, "load_2_db_biz_lookup", len(outputs), lambda: load_2_db_biz_lookup(**context))
+            _timed(stages, "load_ranked_lists", 1, lambda: load_ranked_lists(**context))
+            _timed(stages, "compute_indicators", len(outputs), lambda: compute_indicators(**context))
+
+            # Incremental build on the bench target, like the daily dbt_run group
+            dbt = run_dbt(False, DBT_PROJECT_PATH / "target" / "pipeline")
+            stages["dbt_run"] = {
+                "seconds": dbt["seconds"],
+                "units": len(dbt["models"]),
+                "units_per_second": round(len(dbt["models"]) / dbt["seconds"], 2) if dbt["seconds"] else None,
+            }
+            results["dbt_models"] = dbt["models"]
+    finally:
+        total = time.perf_counter() - started
+        if server:
+            server.shutdown()
+        if args.storage_dir is None:
+            shutil.rmtree(storage_dir, ignore_errors=True)
+
+    api_stats = dict(mock.stats) if mock else {}
+    results["end_to_end_seconds"] = round(total, 3)
+    results["api"] = {
+        **api_stats,
+        "calls_per_second": round(api_stats.get("calls", 0) / total, 2) if total else None,
+    }
+    results["client"] = counters
+
+    for stage, stats in stages.items():
+        logging.info("%-28s %8.3fs %6d units %8s units/s", stage, stats["seconds"], stats["units"], stats["units_per_second"])
+    logging.info("API calls: %s (%s/s), throttled: %s, errors: %s",
+                 api_stats.get("calls"), results["api"]["calls_per_second"],
+                 api_stats.get("throttled", 0), api_stats.get("errors", 0))
+    logging.info("End-to-end: %.3fs", total)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+Synthetic Alpha Vantage-shaped data for raw_most_active_stocks and raw_ranked_lists.
+
+Scale is configured as days x tickers x bars x news items:
+    python -m benchmarks.synthetic_data --days 750 --tickers 50 --bars 100 --news-items 50
+
+The raw table keeps three price/news slots per day (price1-3, new1-3), so `tickers`
+sizes the most_active list and the ticker universe, while price/news payloads are
+generated for the top 3 of each day, exactly like the extraction tasks.
+"""
+import argparse
+import datetime as dt
+import logging
+import os
+import random
+import string
+
+import psycopg2
+from psycopg2.extras import Json, execute_values
+from psycopg2 import sql
+
+from include.tasks.load_2_db import (
+    RANKED_LISTS_TABLE_NAME, TABLE_NAME, _ensure_ranked_lists_table, _ensure_table, ranked_list_rows,
+)
+
+SENTIMENT_LABELS = [
+    (-0.35, "Bearish"),
+    (-0.15, "Somewhat-Bearish"),
+    (0.15, "Neutral"),
+    (0.35, "Somewhat-Bullish"),
+    (float("inf"), "Bullish"),
+]
+NEWS_SOURCES = ["Benzinga", "Motley Fool", "Zacks Commentary", "Reuters", "CNBC"]
+
+# The benchmarks truncate and drop tables, so they never run against the production
+# database (the dbt `dev` target) or the maintenance database
+PROTECTED_DATABASES = ("stocks_db", "postgres")
+
+
+def bench_database():
+    """Name of the benchmark database (BENCH_PG_DB). Raises RuntimeError for a protected database."""
+    dbname = os.getenv("BENCH_PG_DB", "stocks_db_bench")
+    if dbname in PROTECTED_DATABASES:
+        raise RuntimeError(f"BENCH_PG_DB={dbname} is a protected database; the benchmarks drop data. "
+                           f"Point BENCH_PG_DB at a dedicated benchmark database.")
+    return dbname
+
+
+def connect(dbname=None):
+    """psycopg2 connection to the benchmark Postgres (same env vars as the dbt `bench` target)."""
+    return psycopg2.connect(
+        host=os.getenv("BENCH_PG_HOST", "localhost"),
+        port=int(os.getenv("BENCH_PG_PORT", "5000")),
+        user=os.getenv("POSTGRES_USER", "postgres"),
+        password=os.getenv("POSTGRES_PASSWORD", "postgres"),
+        dbname=dbname or bench_database(),
+    )
+
+
+def ensure_database(dbname=None):
+    """Create the benchmark database if it does not exist yet."""
+    dbname = dbname or bench_database()
+    conn = connect("postgres")
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (dbname,))
+            if not cur.fetchone():
+                cur.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(dbname)))
+                logging.info("Created database %s", dbname)
+    finally:
+        conn.close()
+
+
+def trading_days(end, count):
+    """Last `count` weekdays up to and including `end`, oldest first."""
+    days = []
+    day = end
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= dt.timedelta(days=1)
+    return days[::-1]
+
+
+def _label(score):
+    return next(label for bound, label in SENTIMENT_LABELS if score <= bound)
+
+
+class SyntheticMarket:
+    """Random-walk OHLCV per ticker, consistent across days so overlapping bars agree."""
+
+    def __init__(self, tickers, days, bars, seed=0):
+        self.rng = random.Random(seed)
+        self.tickers = self._ticker_universe(tickers)
+        self.calendar = trading_days(days[-1], len(days) + bars)
+        self.bars = bars
+        self.series = {t: self._walk() for t in self.tickers}
+        self.index = {d: i for i, d in enumerate(self.calendar)}
+
+    def _ticker_universe(self, count):
+        # 3x the daily list so the most-active set rotates day to day
+        names = set()
+        while len(names) < count * 3:
+            names.add("".join(self.rng.choices(string.ascii_uppercase, k=self.rng.randint(2, 4))))
+        return sorted(names)
+
+    def _walk(self):
+        price = self.rng.uniform(2, 500)
+        base_volume = self.rng.uniform(1e6, 2e8)
+        bars = []
+        for _ in self.calendar:
+            open_ = price
+            close = max(0.5, open_ * (1 + self.rng.gauss(0, 0.02)))
+            high = max(open_, close) * (1 + abs(self.rng.gauss(0, 0.01)))
+            low = min(open_, close) * (1 - abs(self.rng.gauss(0, 0.01)))
+            volume = int(base_volume * self.rng.lognormvariate(0, 0.5))
+            bars.append((open_, high, low, close, volume))
+            price = close
+        return bars
+
+    def most_active(self, day, tickers):
+        """TOP_GAINERS_LOSERS `most_actively_traded` list for a day, highest volume first."""
+        i = self.index[day]
+        picks = self.rng.sample(self.tickers, tickers)
+        rows = []
+        for ticker in picks:
+            open_, _, _, close, volume = self.series[ticker][i]
+            prev_close = self.series[ticker][i - 1][3] if i else open_
+            change = close - prev_close
+            rows.append({
+                "ticker": ticker,
+                "price": f"{close:.4f}",
+                "change_amount": f"{change:.4f}",
+                "change_percentage": f"{change / prev_close * 100:.4f}%",
+                "volume": str(volume),
+            })
+        return sorted(rows, key=lambda r: int(r["volume"]), reverse=True)
+
+    def time_series_daily(self, ticker, day):
+        """TIME_SERIES_DAILY (compact) payload as of `day`."""
+        i = self.index[day]
+        series = {}
+        for j in range(max(0, i - self.bars + 1), i + 1):
+            open_, high, low, close, volume = self.series[ticker][j]
+            series[self.calendar[j].isoformat()] = {
+                "1. open": f"{open_:.4f}",
+                "2. high": f"{high:.4f}",
+                "3. low": f"{low:.4f}",
+                "4. close": f"{close:.4f}",
+                "5. volume": str(volume),
+            }
+        return {
+            "Meta Data": {
+                "1. Information": "Daily Prices (open, high, low, close) and Volumes",
+                "2. Symbol": ticker,
+                "3. Last Refreshed": day.isoformat(),
+                "4. Output Size": "Compact",
+                "5. Time Zone": "US/Eastern",
+            },
+            "Time Series (Daily)": dict(reversed(list(series.items()))),
+        }
+
+    def news_sentiment(self, ticker, day, items):
+        """NEWS_SENTIMENT payload; each article also mentions a few other tickers."""
+        feed = []
+        for n in range(items):
+            published = dt.datetime.combine(day, dt.time()) - dt.timedelta(minutes=self.rng.randint(0, 7 * 24 * 60))
+            mentioned = [ticker] + self.rng.sample(self.tickers, self.rng.randint(0, 3))
+            overall = self.rng.uniform(-0.6, 0.6)
+            source = self.rng.choice(NEWS_SOURCES)
+            feed.append({
+                "title": f"{ticker} synthetic headline {day.isoformat()} #{n}",
+                "url": f"https://news.example.com/{ticker.lower()}/{day.isoformat()}/{n}",
+                "time_published": published.strftime("%Y%m%dT%H%M%S"),
+                "authors": ["Synthetic Author"],
+                "summary": " ".join(self.rng.choices(string.ascii_lowercase, k=40)),
+                "banner_image": None,
+                "source": source,
+                "category_within_source": "n/a",
+                "source_domain": "news.example.com",
+                "topics": [{"topic": "Financial Markets", "relevance_score": f"{self.rng.random():.6f}"}],
+                "overall_sentiment_score": round(overall, 6),
+                "overall_sentiment_label": _label(overall),
+                "ticker_sentiment": [
+                    {
+                        "ticker": t,
+                        "relevance_score": f"{self.rng.random():.6f}",
+                        "ticker_sentiment_score": f"{score:.6f}",
+                        "ticker_sentiment_label": _label(score),
+                    }
+                    for t, score in ((t, self.rng.uniform(-0.6, 0.6)) for t in dict.fromkeys(mentioned))
+                ],
+            })
+        return {
+            "items": str(items),
+            "sentiment_score_definition": "x <= -0.35: Bearish; -0.35 < x <= -0.15: Somewhat-Bearish; -0.15 < x < 0.15: Neutral; 0.15 <= x < 0.35: Somewhat_Bullish; x >= 0.35: Bullish",
+            "relevance_score_definition": "0 < x <= 1, with a higher score indicating higher relevance.",
+            "feed": feed,
+        }
+
+    def top_gainers_losers(self, day, tickers):
+        """Full TOP_GAINERS_LOSERS payload: gainers, losers and most actively traded."""
+        rows = self.most_active(day, min(len(self.tickers), tickers * 3))
+        by_change = sorted(rows, key=lambda r: float(r["change_percentage"].rstrip("%")), reverse=True)
+        return {
+            "metadata": "Top gainers, losers, and most actively traded US tickers",
+            "last_updated": f"{day.isoformat()} 16:15:59 US/Eastern",
+            "top_gainers": by_change[:tickers],
+            "top_losers": by_change[::-1][:tickers],
+            "most_actively_traded": rows[:tickers],
+        }
+
+    def overview(self, ticker):
+        """OVERVIEW payload (company fundamentals) with the fields biz_info_lookup keeps."""
+        rng = random.Random(f"{ticker}-overview")
+        close = self.series[ticker][-1][3]
+        shares = rng.randint(10**7, 10**10)
+        return {
+            "Symbol": ticker,
+            "AssetType": "Common Stock",
+            "Name": f"{ticker} Synthetic Corp",
+            "Description": " ".join(rng.choices(string.ascii_lowercase, k=60)),
+            "CIK": str(rng.randint(10**5, 10**7)),
+            "Exchange": rng.choice(["NASDAQ", "NYSE"]),
+            "Currency": "USD",
+            "Country": "USA",
+            "Sector": rng.choice(["TECHNOLOGY", "HEALTHCARE", "ENERGY", "FINANCE"]),
+            "Industry": "SYNTHETIC",
+            "Address": "1 MARKET ST, NEW YORK, NY, US",
+            "OfficialSite": f"https://{ticker.lower()}.example.com",
+            "FiscalYearEnd": "December",
+            "LatestQuarter": self.calendar[-1].isoformat(),
+            "MarketCapitalization": str(int(shares * close)),
+            "PERatio": f"{rng.uniform(5, 80):.2f}",
+            "EPS": f"{rng.uniform(-2, 15):.2f}",
+            "Beta": f"{rng.uniform(0.3, 2.5):.3f}",
+            "52WeekHigh": f"{max(b[1] for b in self.series[ticker][-250:]):.2f}",
+            "52WeekLow": f"{min(b[2] for b in self.series[ticker][-250:]):.2f}",
+            "SharesOutstanding": str(shares),
+        }
+
+    def raw_row(self, day, tickers, news_items, ranked_lists=None):
+        """
+        One raw_most_active_stocks row, keyed like load_to_db's column mapping.
+        Pass the day's top_gainers_losers() payload to reuse its most_actively_traded list.
+        """
+        most_active = (ranked_lists or {}).get("most_actively_traded") or self.most_active(day, tickers)
+        top3 = [r["ticker"] for r in most_active[:3]]
+        row = {"date": day, "most_active": Json(most_active)}
+        for slot in range(3):
+            row[f"price{slot + 1}"] = Json(self.time_series_daily(top3[slot], day)) if slot < len(top3) else None
+            row[f"new{slot + 1}"] = Json(self.news_sentiment(top3[slot], day, news_items)) if slot < len(top3) else None
+        return row
+
+
+RAW_COLUMNS = ["date", "most_active", "price1", "price2", "price3", "new1", "new2", "new3"]
+
+
+def insert_days(conn, market, days, tickers, news_items):
+    """Insert synthetic rows for `days` (a subset of the market calendar) into raw_most_active_stocks and raw_ranked_lists."""
+    with conn.cursor() as cur:
+        _ensure_table(cur, TABLE_NAME)
+        _ensure_ranked_lists_table(cur, RANKED_LISTS_TABLE_NAME)
+        ranked = {day: market.top_gainers_losers(day, tickers) for day in days}
+        rows = (
+            [row[c] for c in RAW_COLUMNS]
+            for row in (market.raw_row(day, tickers, news_items, ranked[day]) for day in days)
+        )
+        execute_values(
+            cur,
+            sql.SQL("INSERT INTO {} ({}) VALUES %s ON CONFLICT (date) DO NOTHING").format(
+                sql.Identifier(TABLE_NAME),
+                sql.SQL(", ").join(map(sql.Identifier, RAW_COLUMNS)),
+            ),
+            rows,
+            page_size=50,
+        )
+        execute_values(
+            cur,
+            sql.SQL("INSERT INTO {} (date, list_type, rank, ticker, item) VALUES %s ON CONFLICT DO NOTHING").format(
+                sql.Identifier(RANKED_LISTS_TABLE_NAME)
+            ),
+            [row for day in days for row in ranked_list_rows(day, ranked[day])],
+        )
+    conn.commit()
+    logging.info("Inserted %d days x %d tickers x %d news items", len(days), tickers, news_items)
+
+
+def generate(conn, days, tickers, bars, news_items, end=None, seed=0):
+    """
+    Replace raw_most_active_stocks with `days` trading days of synthetic data ending at `end`.
+    Returns:
+        list[datetime.date]: the generated dates, oldest first
+    """
+    market_days = trading_days(end or dt.date.today(), days)
+    market = SyntheticMarket(tickers, market_days, bars, seed=seed)
+    with conn.cursor() as cur:
+        _ensure_table(cur, TABLE_NAME)
+        _ensure_ranked_lists_table(cur, RANKED_LISTS_TABLE_NAME)
+        cur.execute(sql.SQL("TRUNCATE {}, {}").format(sql.Identifier(TABLE_NAME), sql.Identifier(RANKED_LISTS_TABLE_NAME)))
+    insert_days(conn, market, market_days, tickers, news_items)
+    return market_days
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=250, help="Trading days to generate (default: 250)")
+    parser.add_argument("--tickers", type=int, default=20, help="Tickers in each day's most_active list (default: 20)")
+    parser.add_argument("--bars", type=int, default=100, help="Daily bars per TIME_SERIES_DAILY payload (default: 100)")
+    parser.add_argument("--news-items", type=int, default=50, help="Articles per NEWS_SENTIMENT payload (default: 50)")
+    parser.add_argument("--end", type=dt.date.fromisoformat, default=None, help="Last date to generate (default: today)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    ensure_database()
+    conn = connect()
+    try:
+        generate(conn, args.days, args.tickers, args.bars, args.news_items, end=args.end, seed=args.seed)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
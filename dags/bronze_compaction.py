@@ -0,0 +1,29 @@
+from airflow.sdk import dag, task
+from datetime import datetime
+
+from include.helpers.notifications import slack_notification
+
+
+@dag(
+    start_date=datetime(2023, 1, 1),
+    # Early on the 2nd, once the previous month's last daily run has finished
+    schedule="0 3 2 * *",
+    catchup=False,
+    tags=['stock', 'maintenance', 'bronze'],
+    max_active_runs=1,
+    on_failure_callback=[
+        slack_notification(":red_circle: DAG {{ dag.dag_id }} Failed on {{ ds }}")
+    ],
+)
+def bronze_compaction_dag():
+
+    # Roll completed months of day folders into monthly archives (see include/tasks/bronze_archive.py)
+    @task(task_id="compact_bronze", retries=2)
+    def compact_bronze_task(**context):
+        from include.tasks.bronze_archive import compact_bronze
+
+        return compact_bronze(**context)
+
+    compact_bronze_task()
+
+bronze_compaction_dag()
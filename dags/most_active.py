@@ -1,21 +1,21 @@
 from airflow.sdk import dag, task, task_group
 from airflow.providers.standard.operators.empty import EmptyOperator
 from airflow.task.trigger_rule import TriggerRule
-from airflow.providers.slack.notifications.slack import send_slack_notification
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
+import logging
 import os
 
-# tasks
-from include.tasks.checking_b4_extraction import is_holiday, create_today_folder, check_files_exist_in_folder
-from include.tasks.extract_stock_info import extract_most_active_stocks, extract_price_top3_most_active_stocks, extract_price_top3_most_active_stocks, extract_news_top3_most_active_stocks, extract_biz_info_top3_most_active_stocks
-from include.tasks.load_2_db import load_to_db, load_2_db_biz_lookup
+# Only what the DAG structure needs is imported at parse time. Task modules (and with them
+# pandas_market_calendars, numpy, requests, minio, psycopg2) are imported inside the task callables.
+# benchmarks/parse_time.py measures the parse-time import cost.
+from include.helpers.notifications import slack_notification
+from include.operators.alpha_vantage import AlphaVantageExtractOperator
+from include.tasks.dbt_selection import model_lineage, plan_dbt_selection, skip_unselected_model
 
-# dbt
-from airflow.providers.common.sql.operators.sql import SQLExecuteQueryOperator
+# dbt (the task group is built from the dbt project at parse time)
 from cosmos import DbtTaskGroup, ProjectConfig, ProfileConfig
 from cosmos.profiles.postgres import PostgresUserPasswordProfileMapping
-import os
 
 
 
@@ -25,29 +25,26 @@ import os
     catchup=False,
     tags=['stock', 'price','most_active'],
     max_active_runs=1,
-    max_active_tasks=1,
     on_success_callback=[
-        send_slack_notification(
-            slack_conn_id='slack',
-            text=":tada: DAG {{ dag.dag_id }} Succeeded on {{ ds }}",
-            channel='general'
-        )
+        slack_notification(":tada: DAG {{ dag.dag_id }} Succeeded on {{ ds }}")
     ],
     on_failure_callback=[
-        send_slack_notification(
-            slack_conn_id='slack',
-            text=":red_circle: DAG {{ dag.dag_id }} Failed on {{ ds }}",
-            channel='general'
-        )
+        slack_notification(":red_circle: DAG {{ dag.dag_id }} Failed on {{ ds }}")
     ],
 )
 def most_active_dag():
 
-    end_task = EmptyOperator(task_id="end_task")
+    # Reached from the holiday branch or after dbt_run, whose tasks may all be skipped
+    end_task = EmptyOperator(
+        task_id="end_task",
+        trigger_rule=TriggerRule.NONE_FAILED_MIN_ONE_SUCCESS,
+    )
 
     # Task to check if today is a holiday
     @task.branch(task_id="check_holiday")
     def check_holiday():
+        from include.tasks.checking_b4_extraction import is_holiday
+
         holiday = is_holiday()
         if holiday:
             return "end_task"
@@ -56,6 +53,8 @@ def most_active_dag():
     
     @task(task_id="create_today_folder", pool="api_pool")
     def create_date_folder():
+        from include.tasks.checking_b4_extraction import create_today_folder
+
         return create_today_folder()
 
     # Task Group for Extraction from API
@@ -65,6 +64,8 @@ def most_active_dag():
         @task.branch(task_id="check_existing_files", pool="api_pool")
         def check_existing_files(folder_path):
             """Check which files exist and determine where to start extraction"""
+            from include.tasks.checking_b4_extraction import check_files_exist_in_folder
+
             next_task = check_files_exist_in_folder()
             
             # Return full task path within the task group
@@ -73,22 +74,28 @@ def most_active_dag():
             else:
                 return f"Extraction_from_API.{next_task}"
     
-        # Use pool to limit concurrent API calls
-        @task(task_id="extract_most_active_stocks", pool="api_pool")
+        # Use pool to limit concurrent API calls; a throttled call fails the try and the
+        # retry waits with exponential backoff outside the worker
+        @task(
+            task_id="extract_most_active_stocks",
+            pool="api_pool",
+            retries=3,
+            retry_delay=timedelta(minutes=1),
+            retry_exponential_backoff=True,
+        )
         def most_active_stocks_task(folder_path, **context):
+            from include.tasks.extract_stock_info import extract_most_active_stocks
+
             return extract_most_active_stocks(folder_path, **context)
-        
-        @task(task_id="price_top3_most_active_stocks", pool="api_pool", trigger_rule=TriggerRule.NONE_FAILED_MIN_ONE_SUCCESS)
-        def price_top3_most_active_stocks_task(folder_path, **context):
-            return extract_price_top3_most_active_stocks(folder_path, **context)
 
-        @task(task_id="news_top3_most_active_stocks", pool="api_pool", trigger_rule=TriggerRule.NONE_FAILED_MIN_ONE_SUCCESS)
-        def news_top3_most_active_stocks_task(**context):
-            return extract_news_top3_most_active_stocks(**context)
-        
-        @task(task_id="biz_info_top3_most_active_stocks", pool="api_pool", trigger_rule=TriggerRule.NONE_FAILED_MIN_ONE_SUCCESS)
-        def biz_info_top3_most_active_stocks_task(**context):
-            return extract_biz_info_top3_most_active_stocks(**context)
+        # One mapped task instance per ticker and endpoint; api_pool slots bound the concurrency,
+        # a failing ticker only retries itself, and throttling waits are deferred to the triggerer
+        mapped_task_args = {
+            "pool": "api_pool",
+            "retries": 2,
+            "retry_delay": timedelta(minutes=1),
+            "map_index_template": "{{ ticker }}",
+        }
         
         # Empty task to mark extraction complete (convergence point)
         extraction_complete = EmptyOperator(
@@ -99,15 +106,21 @@ def most_active_dag():
         # Task instances
         check_files = check_existing_files(create_folder)
         most_active = most_active_stocks_task(create_folder)
-        price_top3 = price_top3_most_active_stocks_task(create_folder)
-        news_top3 = news_top3_most_active_stocks_task()
-        biz_info_top3 = biz_info_top3_most_active_stocks_task()
-
-        # Dependencies - branch to the appropriate starting point
-        check_files >> [most_active, price_top3, news_top3, biz_info_top3, extraction_complete]
+        price_top3 = AlphaVantageExtractOperator.partial(
+            task_id="price_top3_most_active_stocks", endpoint="price", **mapped_task_args
+        ).expand(unit=most_active)
+        news_top3 = AlphaVantageExtractOperator.partial(
+            task_id="news_top3_most_active_stocks", endpoint="news", **mapped_task_args
+        ).expand(unit=most_active)
+        biz_info_top3 = AlphaVantageExtractOperator.partial(
+            task_id="biz_info_top3_most_active_stocks", endpoint="business_info", **mapped_task_args
+        ).expand(unit=most_active)
+
+        # Dependencies - branch to extraction or straight to completion
+        check_files >> [most_active, extraction_complete]
         
-        # Sequential flow for extraction tasks
-        most_active >> price_top3 >> news_top3 >> biz_info_top3 >> extraction_complete
+        # Price, news and business info run in parallel per ticker
+        [price_top3, news_top3, biz_info_top3] >> extraction_complete
 
 
     # Task Group for Loading to Database (Injection)
@@ -115,16 +128,39 @@ def most_active_dag():
     def loading_group():
         @task(task_id="load_data_to_db")
         def load_data_2_db(**context):
-            load_to_db(**context)
+            from include.tasks.load_2_db import load_to_db
+
+            return load_to_db(**context)
 
         @task(task_id="load_2_db_biz_lookup")
         def load_2_db_biz_lookup_task(**context):
-            load_2_db_biz_lookup(**context)
+            from include.tasks.load_2_db import load_2_db_biz_lookup
+
+            return load_2_db_biz_lookup(**context)
+
+        # Gainers, losers and most actively traded, in long format (date, list_type, rank)
+        @task(task_id="load_ranked_lists")
+        def load_ranked_lists_task(**context):
+            from include.tasks.load_2_db import load_ranked_lists
+
+            return load_ranked_lists(**context)
 
         load_data_task = load_data_2_db()
         load_data_task_2 = load_2_db_biz_lookup_task()
+        load_ranked_lists_data = load_ranked_lists_task()
         
-        load_data_task >> load_data_task_2    
+        load_data_task >> [load_data_task_2, load_ranked_lists_data]
+
+    # Task Group for technical indicators (NumPy, incremental)
+    @task_group(group_id='Indicators')
+    def indicators_group():
+        @task(task_id="compute_indicators")
+        def compute_indicators_task(**context):
+            from include.tasks.compute_indicators import compute_indicators
+
+            return compute_indicators(**context)
+
+        compute_indicators_task()
 
     # Task Group for dbt transformations
     CONNECTION_ID = "postgres_stock"
@@ -156,16 +192,37 @@ def most_active_dag():
             group_id="dbt_transform_data",
             project_config=ProjectConfig(DBT_PROJECT_PATH),
             profile_config=profile_config,
-            default_args={"retries": 2},
+            default_args={
+                "retries": 2,
+                # Only run models downstream of raw tables the loaders actually changed
+                "pre_execute": skip_unselected_model,
+                "trigger_rule": TriggerRule.NONE_FAILED,
+            },
         )
 
-        query_table = SQLExecuteQueryOperator(
-            task_id="query_table_to_check",
-            conn_id=CONNECTION_ID,
-            sql=f"SELECT * FROM {DB_NAME}.{SCHEMA_NAME}.{MODEL_TO_QUERY} LIMIT 10;",
-        )
+        # Always succeeds with an explicit plan ({"models": []} on reruns and idle days); every
+        # dbt task checks it in pre_execute, so an empty or skipped plan skips the whole group
+        @task(task_id="plan_dbt_selection")
+        def plan_dbt_selection_task(lineage, **context):
+            return plan_dbt_selection(lineage, **context)
+
+        plan = plan_dbt_selection_task(model_lineage(transform_data.dbt_graph.nodes))
+
+        # Only after at least one model actually ran
+        @task(task_id="query_table_to_check", trigger_rule=TriggerRule.NONE_FAILED_MIN_ONE_SUCCESS)
+        def query_table_to_check():
+            from airflow.providers.postgres.hooks.postgres import PostgresHook
+
+            rows = PostgresHook(postgres_conn_id=CONNECTION_ID).get_records(
+                f"SELECT * FROM {DB_NAME}.{SCHEMA_NAME}.{MODEL_TO_QUERY} LIMIT 10;"
+            )
+            for row in rows:
+                logging.info(row)
+            return len(rows)
+
+        query_table = query_table_to_check()
         
-        transform_data >> query_table
+        plan >> transform_data >> query_table
 
 
     # Task instances
@@ -173,10 +230,11 @@ def most_active_dag():
     create_folder = create_date_folder()
     extraction = extraction_group()
     loading = loading_group()
+    indicators = indicators_group()
     dbt_tasks = dbt_run()
 
     # --- Task Dependencies ---
     check_holiday_task >> [create_folder, end_task]
-    create_folder >> extraction >> loading >> dbt_tasks >> end_task
+    create_folder >> extraction >> loading >> indicators >> dbt_tasks >> end_task
 
 most_active_dag()
\ No newline at end of file
@@ -0,0 +1,409 @@
+import hashlib
+import io
+import json
+import logging
+import mmap
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from stat import S_ISREG
+
+
+# Backend selection: "minio" (default), "gcs" or "local"
+STORAGE_BACKEND_ENV = "STORAGE_BACKEND"
+LOCAL_STORAGE_ROOT_ENV = "LOCAL_STORAGE_ROOT"
+# Optional prefix for every bucket name (e.g. "bench-" maps "bronze" to "bench-bronze")
+STORAGE_BUCKET_PREFIX_ENV = "STORAGE_BUCKET_PREFIX"
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_BATCH_WORKERS = 8
+
+
+class ObjectNotFoundError(FileNotFoundError):
+    """Raised by ObjectStorage.get/get_range when the object does not exist."""
+
+
+@dataclass
+class ObjectInfo:
+    name: str
+    size: int = 0
+    etag: str = ""
+
+
+class ObjectStorage(ABC):
+    """
+    Object storage interface used by every task (MinIO, GCS or local filesystem).
+    Backends implement get/get_range/put/stat/list_page/ensure_bucket/delete; batching, JSON
+    helpers and paginated listing are shared. A backend missing one of them cannot be instantiated.
+    """
+
+    @abstractmethod
+    def get(self, bucket_name, object_name):
+        """Return the object's bytes. Raises ObjectNotFoundError."""
+
+    @abstractmethod
+    def get_range(self, bucket_name, object_name, offset, length):
+        """Return `length` bytes starting at `offset`. Raises ObjectNotFoundError."""
+
+    @abstractmethod
+    def put(self, bucket_name, object_name, data, content_type="application/json"):
+        """Store bytes. Returns the MD5 (hex) of the data."""
+
+    @abstractmethod
+    def stat(self, bucket_name, object_name):
+        """Return ObjectInfo, or None if the object does not exist. Other failures raise."""
+
+    @abstractmethod
+    def list_page(self, bucket_name, prefix="", page_size=DEFAULT_PAGE_SIZE, page_token=None):
+        """Return (list[ObjectInfo], next_page_token or None), ordered by name."""
+
+    @abstractmethod
+    def ensure_bucket(self, bucket_name):
+        """Create the bucket if it does not exist."""
+
+    @abstractmethod
+    def delete(self, bucket_name, object_name):
+        """Delete the object (no error if it does not exist)."""
+
+    # Shared helpers
+    def exists(self, bucket_name, object_name):
+        return self.stat(bucket_name, object_name) is not None
+
+    def md5(self, bucket_name, object_name):
+        """
+        MD5 (hex) of a stored object from its metadata, without downloading it.
+        Returns None if the object is missing, or "" when the backend has no plain MD5 (multipart ETag).
+        S3 ETags of encrypted objects are not MD5s either, so a mismatch only means "unknown".
+        """
+        info = self.stat(bucket_name, object_name)
+        if info is None:
+            return None
+        return "" if "-" in info.etag else info.etag
+
+    def list(self, bucket_name, prefix="", page_size=DEFAULT_PAGE_SIZE):
+        """Iterate over every object under prefix, one page at a time."""
+        token = None
+        while True:
+            items, token = self.list_page(bucket_name, prefix, page_size, token)
+            yield from items
+            if not token:
+                return
+
+    def list_names(self, bucket_name, prefix="", suffix=""):
+        return [o.name for o in self.list(bucket_name, prefix) if o.name.endswith(suffix)]
+
+    def get_many(self, bucket_name, object_names, max_workers=DEFAULT_BATCH_WORKERS):
+        """Fetch several objects concurrently. Returns {name: bytes or None if missing}."""
+        def fetch(name):
+            try:
+                return self.get(bucket_name, name)
+            except ObjectNotFoundError:
+                return None
+
+        object_names = list(object_names)
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(object_names)))) as pool:
+            return dict(zip(object_names, pool.map(fetch, object_names)))
+
+    def put_many(self, bucket_name, objects, content_type="application/json", max_workers=DEFAULT_BATCH_WORKERS):
+        """Store {name: bytes} concurrently. Returns {name: md5}."""
+        items = list(objects.items())
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as pool:
+            md5s = pool.map(lambda kv: self.put(bucket_name, kv[0], kv[1], content_type), items)
+            return dict(zip((name for name, _ in items), md5s))
+
+    def get_json(self, bucket_name, object_name):
+        """
+        Read and parse a JSON object. Returns None if the object is missing or not valid JSON.
+        Storage failures (credentials, network, missing bucket) are raised, never read as "missing".
+        """
+        try:
+            data = self.get(bucket_name, object_name)
+        except ObjectNotFoundError:
+            logging.debug(f"{bucket_name}/{object_name} does not exist.")
+            return None
+        try:
+            return json.loads(data)
+        except ValueError as e:
+            logging.warning(f"Failed to parse {bucket_name}/{object_name}: {e}")
+            return None
+
+    def put_json(self, bucket_name, object_name, payload):
+        """Serialize payload as UTF-8 JSON and store it. Returns the MD5 (hex) of the stored bytes."""
+        return self.put(bucket_name, object_name, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+
+class MinioStorage(ObjectStorage):
+    """MinIO / S3-compatible backend."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def _read(self, bucket_name, object_name, **kwargs):
+        from minio.error import S3Error
+
+        try:
+            response = self.client.get_object(bucket_name, object_name, **kwargs)
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                raise ObjectNotFoundError(object_name) from e
+            raise
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
+    def get(self, bucket_name, object_name):
+        return self._read(bucket_name, object_name)
+
+    def get_range(self, bucket_name, object_name, offset, length):
+        return self._read(bucket_name, object_name, offset=offset, length=length)
+
+    def put(self, bucket_name, object_name, data, content_type="application/json"):
+        self.client.put_object(bucket_name, object_name, io.BytesIO(data), len(data), content_type=content_type)
+        return hashlib.md5(data).hexdigest()
+
+    def stat(self, bucket_name, object_name):
+        from minio.error import S3Error
+
+        try:
+            obj = self.client.stat_object(bucket_name, object_name)
+        except S3Error as e:
+            # Only a missing key means "no object"; auth, bucket and network errors propagate
+            if e.code == "NoSuchKey":
+                return None
+            raise
+        return ObjectInfo(object_name, obj.size, (obj.etag or "").strip('"'))
+
+    def list_page(self, bucket_name, prefix="", page_size=DEFAULT_PAGE_SIZE, page_token=None):
+        # MinIO pages internally; start_after makes the page boundary resumable
+        items = []
+        for obj in self.client.list_objects(bucket_name, prefix=prefix, recursive=True, start_after=page_token):
+            items.append(ObjectInfo(obj.object_name, obj.size or 0, (obj.etag or "").strip('"')))
+            if len(items) == page_size:
+                return items, obj.object_name
+        return items, None
+
+    def ensure_bucket(self, bucket_name):
+        if not self.client.bucket_exists(bucket_name):
+            self.client.make_bucket(bucket_name)
+            logging.info("Created bucket %s", bucket_name)
+
+    def delete(self, bucket_name, object_name):
+        self.client.remove_object(bucket_name, object_name)
+
+
+class GcsStorage(ObjectStorage):
+    """Google Cloud Storage backend (google.cloud.storage.Client)."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def _download(self, bucket_name, object_name, **kwargs):
+        from google.api_core.exceptions import NotFound
+
+        try:
+            return self.client.bucket(bucket_name).blob(object_name).download_as_bytes(**kwargs)
+        except NotFound as e:
+            raise ObjectNotFoundError(object_name) from e
+
+    def get(self, bucket_name, object_name):
+        return self._download(bucket_name, object_name)
+
+    def get_range(self, bucket_name, object_name, offset, length):
+        return self._download(bucket_name, object_name, start=offset, end=offset + length - 1)
+
+    def put(self, bucket_name, object_name, data, content_type="application/json"):
+        self.client.bucket(bucket_name).blob(object_name).upload_from_string(data, content_type=content_type)
+        return hashlib.md5(data).hexdigest()
+
+    def stat(self, bucket_name, object_name):
+        import base64
+
+        blob = self.client.bucket(bucket_name).get_blob(object_name)
+        if blob is None:
+            return None
+        etag = base64.b64decode(blob.md5_hash).hex() if blob.md5_hash else "-"
+        return ObjectInfo(object_name, blob.size or 0, etag)
+
+    def list_page(self, bucket_name, prefix="", page_size=DEFAULT_PAGE_SIZE, page_token=None):
+        blobs = self.client.list_blobs(bucket_name, prefix=prefix, max_results=page_size, page_token=page_token)
+        page = next(blobs.pages, [])
+        items = [ObjectInfo(b.name, b.size or 0, "") for b in page]
+        return items, blobs.next_page_token
+
+    def ensure_bucket(self, bucket_name):
+        if not self.client.bucket(bucket_name).exists():
+            self.client.create_bucket(bucket_name)
+            logging.info("Created bucket %s", bucket_name)
+
+    def delete(self, bucket_name, object_name):
+        self.client.bucket(bucket_name).blob(object_name).delete()
+
+
+class LocalStorage(ObjectStorage):
+    """
+    Local filesystem backend: objects live under <root>/<bucket>/<object_name>.
+    Reads are memory-mapped, so ranged reads only touch the requested pages.
+    Object names ending with "/" (folder markers) are stored as directories.
+    The etag is a size/mtime change token, not an MD5 (like a multipart ETag, it contains "-").
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _path(self, bucket_name, object_name):
+        return self.root / bucket_name / object_name
+
+    def _mapped(self, bucket_name, object_name, offset=0, length=None):
+        path = self._path(bucket_name, object_name)
+        try:
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    return b""
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    end = size if length is None else min(size, offset + length)
+                    return mm[offset:end]
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError) as e:
+            raise ObjectNotFoundError(object_name) from e
+
+    def get(self, bucket_name, object_name):
+        return self._mapped(bucket_name, object_name)
+
+    def get_range(self, bucket_name, object_name, offset, length):
+        return self._mapped(bucket_name, object_name, offset, length)
+
+    def put(self, bucket_name, object_name, data, content_type="application/json"):
+        path = self._path(bucket_name, object_name)
+        if object_name.endswith("/"):
+            path.mkdir(parents=True, exist_ok=True)
+            return hashlib.md5(data).hexdigest()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so readers never see a partial object
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        return hashlib.md5(data).hexdigest()
+
+    def stat(self, bucket_name, object_name):
+        path = self._path(bucket_name, object_name)
+        if object_name.endswith("/"):
+            return ObjectInfo(object_name) if path.is_dir() else None
+        try:
+            st = path.stat()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if not S_ISREG(st.st_mode):
+            return None
+        return ObjectInfo(object_name, st.st_size, f"{st.st_mtime_ns:x}-{st.st_size:x}")
+
+    def _walk(self, bucket_name, rel, prefix, start_after):
+        """
+        Yield (name, size) below directory `rel` in name order, lazily. Only subtrees that can
+        hold names matching prefix and sorting after start_after are visited.
+        """
+        try:
+            with os.scandir(self.root / bucket_name / rel) as it:
+                entries = [e for e in it if not e.name.startswith(".")]
+        except (FileNotFoundError, NotADirectoryError):
+            return
+        if rel and not entries:
+            # Empty folder marker
+            if rel.startswith(prefix) and (start_after is None or rel > start_after):
+                yield rel, 0
+            return
+        # A directory sorts as "<name>/", so the names under it stay contiguous and in order
+        children = sorted(((e.name + "/" if e.is_dir() else e.name, e) for e in entries), key=lambda c: c[0])
+        for name, entry in children:
+            key = rel + name
+            if not (key.startswith(prefix) or prefix.startswith(key)):
+                continue
+            if entry.is_dir():
+                # Everything under key sorts before start_after unless start_after is inside it
+                if start_after is None or key > start_after or start_after.startswith(key):
+                    yield from self._walk(bucket_name, key, prefix, start_after)
+            elif key.startswith(prefix) and (start_after is None or key > start_after):
+                yield key, entry.stat().st_size
+
+    def list_page(self, bucket_name, prefix="", page_size=DEFAULT_PAGE_SIZE, page_token=None):
+        # Start at the deepest directory the prefix names instead of the bucket root
+        start = prefix.rsplit("/", 1)[0] + "/" if "/" in prefix else ""
+        items = []
+        for name, size in self._walk(bucket_name, start, prefix, page_token):
+            if len(items) == page_size:
+                return items, items[-1].name
+            items.append(ObjectInfo(name, size))
+        return items, None
+
+    def ensure_bucket(self, bucket_name):
+        (self.root / bucket_name).mkdir(parents=True, exist_ok=True)
+
+    def delete(self, bucket_name, object_name):
+        path = self._path(bucket_name, object_name)
+        if path.is_dir():
+            path.rmdir()
+        else:
+            path.unlink(missing_ok=True)
+        # Like an object store, a prefix disappears with its last object
+        bucket = self.root / bucket_name
+        for parent in path.parents:
+            if parent == bucket or not parent.is_dir() or any(parent.iterdir()):
+                break
+            parent.rmdir()
+
+
+class PrefixedStorage(ObjectStorage):
+    """Wrap a backend so every bucket name gets a prefix; task code keeps its own bucket names."""
+
+    def __init__(self, storage, prefix):
+        self.storage = storage
+        self.prefix = prefix
+
+    def get(self, bucket_name, object_name):
+        return self.storage.get(self.prefix + bucket_name, object_name)
+
+    def get_range(self, bucket_name, object_name, offset, length):
+        return self.storage.get_range(self.prefix + bucket_name, object_name, offset, length)
+
+    def put(self, bucket_name, object_name, data, content_type="application/json"):
+        return self.storage.put(self.prefix + bucket_name, object_name, data, content_type)
+
+    def stat(self, bucket_name, object_name):
+        return self.storage.stat(self.prefix + bucket_name, object_name)
+
+    def list_page(self, bucket_name, prefix="", page_size=DEFAULT_PAGE_SIZE, page_token=None):
+        return self.storage.list_page(self.prefix + bucket_name, prefix, page_size, page_token)
+
+    def ensure_bucket(self, bucket_name):
+        self.storage.ensure_bucket(self.prefix + bucket_name)
+
+    def delete(self, bucket_name, object_name):
+        self.storage.delete(self.prefix + bucket_name, object_name)
+
+
+def get_storage():
+    """
+    Build the ObjectStorage configured by STORAGE_BACKEND ("minio" by default, "gcs" or "local").
+    The local backend stores objects under LOCAL_STORAGE_ROOT (default: include/data/objects).
+    With STORAGE_BUCKET_PREFIX set, bucket names are prefixed (benchmarks use their own buckets).
+    """
+    prefix = os.getenv(STORAGE_BUCKET_PREFIX_ENV, "")
+    storage = _backend_storage()
+    return PrefixedStorage(storage, prefix) if prefix else storage
+
+
+def _backend_storage():
+    backend = os.getenv(STORAGE_BACKEND_ENV, "minio").lower()
+    if backend == "local":
+        default_root = Path(__file__).resolve().parent.parent / "data" / "objects"
+        return LocalStorage(os.getenv(LOCAL_STORAGE_ROOT_ENV, str(default_root)))
+    if backend == "gcs":
+        from airflow.providers.google.cloud.hooks.gcs import GCSHook
+
+        return GcsStorage(GCSHook(gcp_conn_id='google_cloud_default').get_conn())
+
+    from include.connection.connect_database import _connect_database
+
+    return MinioStorage(_connect_database())
@@ -1,6 +1,7 @@
 {{config(
     materialized='incremental',
     unique_key=['date', 'ticker'],
+    on_schema_change='append_new_columns',
     tags=['mart']
 )}}
 
@@ -63,6 +64,12 @@ price_final AS (
     FROM price_combined
 ),
 
+indicators AS (
+    SELECT 
+        *
+    FROM {{ source('stocks_db', 'int_indicators') }}
+),
+
 final AS (
     SELECT 
         pf.*,
@@ -71,13 +78,34 @@ final AS (
         ns.neutral_count,
         ns.somewhat_bullish_count,
         ns.somewhat_bearish_count,
-        ns.avg_sentiment_score
+        ns.avg_sentiment_score,
+        ind.sma_20,
+        ind.sma_50,
+        ind.sma_200,
+        ind.ema_20,
+        ind.ema_50,
+        ind.ema_200,
+        ind.rsi_14,
+        ind.atr_14,
+        ind.bb_middle,
+        ind.bb_upper,
+        ind.bb_lower,
+        ind.volume_zscore_20
     FROM 
         price_final pf
     LEFT JOIN 
         news_sentiment ns
         ON pf.date = ns.extraction_date
         AND pf.ticker = ns.mentioned_ticker
+    -- Latest bar on or before the extraction date
+    LEFT JOIN LATERAL (
+        SELECT *
+        FROM indicators i
+        WHERE i.symbol = pf.ticker
+        AND i.price_date <= pf.date
+        ORDER BY i.price_date DESC
+        LIMIT 1
+    ) ind ON true
 )
 
 SELECT * FROM final
\ No newline at end of file
@@ -0,0 +1,32 @@
+{{config(
+    materialized='incremental',
+    unique_key=['date', 'list_type', 'rank']
+)}}
+
+WITH ranked_lists AS (
+    SELECT
+        date,
+        list_type,
+        rank,
+        ticker,
+        item
+    FROM {{ source('stocks_db', 'raw_ranked_lists') }}
+    {% if is_incremental() %}
+    WHERE date > (SELECT max(date) FROM {{ this }})
+    {% endif %}
+),
+
+final AS (
+    SELECT
+        date,
+        list_type,
+        rank,
+        ticker,
+        (item->>'price')::numeric AS price,
+        (item->>'change_amount')::numeric AS change_amount,
+        REPLACE(item->>'change_percentage', '%', '')::numeric AS change_percentage,
+        (item->>'volume')::bigint AS volume
+    FROM ranked_lists
+)
+
+SELECT * FROM final
@@ -0,0 +1,13 @@
+def slack_notification(text, slack_conn_id='slack', channel='general'):
+    """
+    DAG callback that sends a Slack message.
+    The Slack provider is imported when the callback fires, not when the DAG file is parsed.
+    Args:
+        text (str): Jinja-templated message, rendered with the callback context
+    """
+    def notify(context):
+        from airflow.providers.slack.notifications.slack import send_slack_notification
+
+        send_slack_notification(slack_conn_id=slack_conn_id, text=text, channel=channel)(context)
+
+    return notify
@@ -0,0 +1,67 @@
+import logging
+from datetime import timedelta
+from airflow.sdk import BaseOperator, get_current_context
+
+
+class AlphaVantageExtractOperator(BaseOperator):
+    """
+    Extract one endpoint for one ticker (see extract_ticker_endpoint).
+
+    When Alpha Vantage throttles the request, the task defers to the triggerer for an
+    exponential backoff instead of sleeping, so the worker slot (and the api_pool slot)
+    is released while waiting for quota.
+
+    Args:
+        endpoint (str): key of extract_stock_info.ENDPOINTS ('price', 'news', 'business_info')
+        unit (TickerUnit): ticker of this unit (include/tasks/contracts.py), usually mapped
+            with .expand(unit=extract_most_active_stocks_output); object keys are derived per endpoint
+        max_throttle_waits (int): deferrals allowed before failing the try. Defaults to 5.
+        max_backoff (timedelta): cap for a single wait. Defaults to 15 minutes.
+    """
+
+    template_fields = ("unit",)
+
+    def __init__(
+        self,
+        *,
+        endpoint,
+        unit,
+        max_throttle_waits=5,
+        max_backoff=timedelta(minutes=15),
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.endpoint = endpoint
+        self.unit = unit
+        self.max_throttle_waits = max_throttle_waits
+        self.max_backoff = max_backoff
+
+    def execute(self, context):
+        return self._extract(context, throttle_waits=0)
+
+    def execute_complete(self, context, event=None, throttle_waits=0):
+        """Resume after a deferred backoff and try the request again."""
+        return self._extract(context, throttle_waits=throttle_waits)
+
+    def _extract(self, context, throttle_waits):
+        # Imported here so parsing the DAG does not load requests, minio and the task modules
+        from airflow.providers.standard.triggers.temporal import TimeDeltaTrigger
+        from include.tasks.extract_stock_info import ApiThrottled, extract_ticker_endpoint
+
+        # Rendered by map_index_template="{{ ticker }}" from the task's runtime context, which
+        # get_current_context() returns (also after resuming from a deferral)
+        get_current_context()["ticker"] = self.unit["symbol"]
+        try:
+            return extract_ticker_endpoint(self.endpoint, self.unit)
+        except ApiThrottled as e:
+            if throttle_waits >= self.max_throttle_waits:
+                logging.error(f"Still throttled after {throttle_waits} waits: {e}")
+                raise
+
+            wait = min(timedelta(seconds=e.retry_after * 2 ** throttle_waits), self.max_backoff)
+            logging.warning(f"{e}. Deferring {wait} before retrying {self.unit['symbol']} ({self.endpoint}).")
+            self.defer(
+                trigger=TimeDeltaTrigger(wait),
+                method_name="execute_complete",
+                kwargs={"throttle_waits": throttle_waits + 1},
+            )
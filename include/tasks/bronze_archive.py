@@ -0,0 +1,228 @@
+import gzip
+import hashlib
+import json
+import logging
+import re
+from collections import defaultdict
+import pendulum
+from include.connection.storage import get_storage
+
+
+BUCKET_NAME = "bronze"
+# Monthly archives: _archive/<YYYY-MM>/<group>-<generation>.jsonl.gz plus _archive/<YYYY-MM>/index.json
+ARCHIVE_FOLDER = "_archive"
+INDEX_NAME = "index.json"
+ARCHIVE_SUFFIX = ".jsonl.gz"
+ARCHIVE_CODEC = "gzip"
+
+DAY_KEY = re.compile(r"^(\d{4}-\d{2})-\d{2}(/|$)")
+
+
+def _month_of(object_name):
+    """'2026-09-14/price/0_NVDA_stocks_price.json' -> '2026-09' (None outside day folders)."""
+    match = DAY_KEY.match(object_name)
+    return match.group(1) if match else None
+
+
+def _group_of(object_name):
+    """
+    Archive an object belongs to: the endpoint folder ('price', 'news', 'business_info',
+    '_checkpoints') or 'most_active' for files at the root of the day folder.
+    """
+    parts = object_name.split("/")
+    return parts[1] if len(parts) > 2 else "most_active"
+
+
+def _index_name(month):
+    return f"{ARCHIVE_FOLDER}/{month}/{INDEX_NAME}"
+
+
+def _pack(data):
+    """
+    One gzip member per object. Members concatenate into a valid gzip stream, so an archive
+    is plain JSONL once decompressed, while each member can be fetched alone by offset.
+    """
+    return gzip.compress(data + b"\n", mtime=0)
+
+
+def _unpack(member, size):
+    return gzip.decompress(member)[:size]
+
+
+def read_archived(storage, bucket_name, index, object_names):
+    """
+    Read objects from a month's archives only. Returns {name: bytes} for the names in the index.
+    A day's objects are adjacent in an archive, so one ranged read per archive covers them.
+    """
+    by_archive = defaultdict(list)
+    for name in object_names:
+        entry = index["objects"].get(name)
+        if entry:
+            by_archive[index["archives"][entry["archive"]]].append((name, entry))
+
+    found = {}
+    for archive_name, entries in by_archive.items():
+        start = min(e["offset"] for _, e in entries)
+        end = max(e["offset"] + e["length"] for _, e in entries)
+        span = storage.get_range(bucket_name, archive_name, start, end - start)
+        for name, entry in entries:
+            offset = entry["offset"] - start
+            found[name] = _unpack(span[offset:offset + entry["length"]], entry["size"])
+    return found
+
+
+class BronzeReader:
+    """
+    Read day folders of the bronze bucket whether they are still loose objects or compacted
+    into monthly archives. Names are resolved against the month's index first: archived objects
+    are fetched with one ranged read per archive, and only names the index does not cover are
+    fetched one GET each. Loose objects written after compaction (one listing per day) win over
+    archived copies of the same key.
+    """
+
+    def __init__(self, storage, bucket_name=BUCKET_NAME):
+        self.storage = storage
+        self.bucket_name = bucket_name
+        self._indexes = {}
+        self._loose = {}
+
+    def index(self, month):
+        """Archive index of a month, or None if the month has not been compacted."""
+        if month not in self._indexes:
+            self._indexes[month] = self.storage.get_json(self.bucket_name, _index_name(month))
+        return self._indexes[month]
+
+    def list_names(self, prefix, suffix=""):
+        """Object names under prefix (a day folder or below), loose and archived."""
+        names = set(self.storage.list_names(self.bucket_name, prefix=prefix, suffix=suffix))
+        month = _month_of(prefix)
+        index = self.index(month) if month else None
+        if index:
+            names.update(n for n in index["objects"] if n.startswith(prefix) and n.endswith(suffix))
+        return sorted(names)
+
+    def _loose_names(self, day_folder):
+        """Loose objects of a day folder of a compacted month (normally none)."""
+        if day_folder not in self._loose:
+            self._loose[day_folder] = set(self.storage.list_names(self.bucket_name, prefix=f"{day_folder}/"))
+        return self._loose[day_folder]
+
+    def get_many(self, object_names):
+        """Returns {name: bytes or None if missing}."""
+        object_names = list(object_names)
+        archived, loose = defaultdict(list), []
+        for name in object_names:
+            month = _month_of(name)
+            index = self.index(month) if month else None
+            if index and name in index["objects"] and name not in self._loose_names(name.split("/")[0]):
+                archived[month].append(name)
+            else:
+                loose.append(name)
+
+        found = {}
+        for month, names in archived.items():
+            found.update(read_archived(self.storage, self.bucket_name, self.index(month), names))
+        if loose:
+            found.update(self.storage.get_many(self.bucket_name, loose))
+        return {name: found.get(name) for name in object_names}
+
+    def get_json(self, object_name):
+        """Read and parse one JSON object. Returns None if missing or unreadable."""
+        data = self.get_many([object_name])[object_name]
+        if data is None:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError as e:
+            logging.warning(f"Failed to parse {object_name}: {e}")
+            return None
+
+
+def compact_month(storage, month, bucket_name=BUCKET_NAME, delete_originals=True):
+    """
+    Roll every loose object of a month's day folders into one archive per group and write the
+    offset index. Objects archived earlier are carried over, so the job can be rerun safely.
+    Originals are deleted only after the new archives have been read back and verified.
+    Args:
+        month (str): 'YYYY-MM'
+    Returns:
+        dict: {"month": str, "archived": objects in the index, "compacted": loose objects rolled in}
+    """
+    reader = BronzeReader(storage, bucket_name)
+    previous = reader.index(month)
+    generation = previous["generation"] + 1 if previous else 1
+
+    # Zero-byte folder markers (e.g. '2026-09-14/') carry no data and are only deleted
+    loose = [n for n in storage.list_names(bucket_name, prefix=f"{month}-") if _month_of(n)]
+    markers = [n for n in loose if n.endswith("/")]
+    loose = [n for n in loose if not n.endswith("/")]
+
+    objects = dict(zip(loose, storage.get_many(bucket_name, loose).values()))
+    if previous:
+        carried = [n for n in previous["objects"] if n not in objects]
+        objects.update(reader.get_many(carried))
+    objects = {name: data for name, data in objects.items() if data is not None}
+    if not objects:
+        logging.info(f"Nothing to compact for {month}.")
+        return {"month": month, "archived": 0, "compacted": 0}
+
+    index = {"month": month, "generation": generation, "codec": ARCHIVE_CODEC, "archives": {}, "objects": {}}
+    archives = defaultdict(list)
+    for name in sorted(objects):
+        archives[_group_of(name)].append(name)
+
+    for group, names in archives.items():
+        archive_name = f"{ARCHIVE_FOLDER}/{month}/{group}-{generation}{ARCHIVE_SUFFIX}"
+        chunks, offset = [], 0
+        for name in names:
+            member = _pack(objects[name])
+            index["objects"][name] = {
+                "archive": group,
+                "offset": offset,
+                "length": len(member),
+                "size": len(objects[name]),
+                "md5": hashlib.md5(objects[name]).hexdigest(),
+            }
+            chunks.append(member)
+            offset += len(member)
+        storage.put(bucket_name, archive_name, b"".join(chunks), content_type="application/gzip")
+        index["archives"][group] = archive_name
+        logging.info(f"Wrote {archive_name} ({len(names)} objects, {offset} bytes)")
+
+    # Verify every member before the index makes the new generation visible
+    restored = read_archived(storage, bucket_name, index, index["objects"])
+    corrupted = [n for n, entry in index["objects"].items()
+                 if n not in restored or hashlib.md5(restored[n]).hexdigest() != entry["md5"]]
+    if corrupted:
+        raise ValueError(f"Archive verification failed for {month}: {corrupted[:10]}")
+
+    storage.put_json(bucket_name, _index_name(month), index)
+    logging.info(f"Wrote {_index_name(month)} (generation {generation}, {len(index['objects'])} objects)")
+
+    if delete_originals:
+        stale_archives = set(previous["archives"].values()) - set(index["archives"].values()) if previous else set()
+        # Deepest first, so folder markers go after their contents
+        for name in sorted([*loose, *stale_archives, *markers], key=lambda n: n.count("/"), reverse=True):
+            storage.delete(bucket_name, name)
+        logging.info(f"Deleted {len(loose)} loose objects, {len(markers)} folder markers and {len(stale_archives)} old archives.")
+
+    return {"month": month, "archived": len(index["objects"]), "compacted": len(loose)}
+
+
+def compact_bronze(timezone="America/New_York", **kwargs):
+    """
+    Compact every completed month (before the current one) that still has loose day folders.
+    Returns:
+        list[dict]: compact_month() result per month
+    """
+    storage = get_storage()
+    current_month = pendulum.today(timezone).format("YYYY-MM")
+
+    months = set()
+    for info in storage.list(BUCKET_NAME):
+        month = _month_of(info.name)
+        if month and month < current_month:
+            months.add(month)
+    logging.info(f"Months to compact: {sorted(months)}")
+
+    return [compact_month(storage, month) for month in sorted(months)]
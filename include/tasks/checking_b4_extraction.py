@@ -1,9 +1,7 @@
 import logging
 import pendulum
-from include.connection.connect_database import _connect_database
-import pandas_market_calendars
-import numpy as np
-import io
+from include.connection.storage import get_storage
+from include.tasks.extract_stock_info import _read_most_active_from_storage, pending_units
 
 # BUCKET_NAME = "bronze-my-de-project-485605"
 BUCKET_NAME = "bronze"
@@ -20,6 +18,10 @@ def is_holiday(
     Returns:
         bool: True if today is a holiday, False otherwise.
     """ 
+    # Only this check needs the market calendar (pandas), so it is imported here
+    import pandas_market_calendars
+    import numpy as np
+
     today = pendulum.today(timezone).to_date_string()
     today = np.datetime64(today)
 
@@ -37,11 +39,11 @@ def is_holiday(
     return False
 
 
-def is_today_folder_exists(client, bucket_name=BUCKET_NAME, folder_name=None):
-    '''Check if today's folder exists in the specified GCS bucket.
+def is_today_folder_exists(storage, bucket_name=BUCKET_NAME, folder_name=None):
+    '''Check if today's folder exists in the specified bucket.
     Args:
-        client (google.cloud.storage.Client): Google Cloud Storage client.
-        bucket_name (str): Name of the GCS bucket.
+        storage (ObjectStorage): Object storage from get_storage().
+        bucket_name (str): Name of the bucket.
         folder_name (str, optional): Specific folder name to check. Defaults to today's date in 'America/New_York' timezone.
         Returns:
         bool: True if the folder exists, False otherwise.
@@ -50,58 +52,31 @@ def is_today_folder_exists(client, bucket_name=BUCKET_NAME, folder_name=None):
     folder = folder_name or f"{pendulum.today('America/New_York').to_date_string()}/"
     
     try:
-        if hasattr(client, "bucket_exists"):
-            # Minio implementation
-            # Check if any object starts with the folder prefix
-            objs = list(client.list_objects(bucket_name, prefix=folder, recursive=True))
-            if objs:
-                return True
-            logging.info("Folder does not exist: %s/%s", bucket_name, folder)
-            return False
-
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(folder)
-        if blob.exists():
+        # A folder exists if its marker or any object with this prefix exists
+        objs, _ = storage.list_page(bucket_name, prefix=folder, page_size=1)
+        if objs:
             return True
-        else:
-            # Check if there are any objects with this prefix, acting as a folder
-            blobs = list(client.list_blobs(bucket_name, prefix=folder, max_results=1))
-            if blobs:
-                return True
-            logging.info("Folder does not exist: %s/%s", bucket_name, folder)
-            return False
+        logging.info("Folder does not exist: %s/%s", bucket_name, folder)
+        return False
     except Exception as exc:
         logging.exception("Failed to check folder existence for bucket=%s, prefix=%s", bucket_name, folder)
         raise
 
 def create_today_folder():
     """
-    Create today's folder in the specified GCS bucket if it doesn't exist.
+    Create today's folder in the specified bucket if it doesn't exist.
     Returns:
         str: The path of the created folder in the format 'bucket_name/folder_name/'
     """
-    client = _connect_database()
+    storage = get_storage()
     bucket_name = BUCKET_NAME
     folder = f"{pendulum.today('America/New_York').to_date_string()}/"
 
     try:
-        if hasattr(client, "make_bucket"):
-            if not client.bucket_exists(bucket_name):
-                client.make_bucket(bucket_name)
-                logging.info("Created bucket %s", bucket_name)
-            
-            client.put_object(bucket_name, folder, io.BytesIO(b""), 0)
-            logging.info("Created folder %s/%s", bucket_name, folder)
-            return f"{bucket_name}/{folder}"
-
-        bucket = client.bucket(bucket_name)
-        if not bucket.exists():
-            client.create_bucket(bucket_name)
-            logging.info("Created bucket %s", bucket_name)
+        storage.ensure_bucket(bucket_name)
 
         # Create a "folder" by uploading an empty object with a trailing slash
-        blob = bucket.blob(folder)
-        blob.upload_from_string("")
+        storage.put(bucket_name, folder, b"")
         logging.info("Created folder %s/%s", bucket_name, folder)
 
         return f"{bucket_name}/{folder}"
@@ -111,28 +86,22 @@ def create_today_folder():
 
 def check_files_exist_in_folder():
     """
-    Check which files exist in today's folder and determine which task to start from.
-    
+    Check which files exist in today's folder and decide whether extraction is needed.
+    Completeness comes from the checkpoint of each top-N ticker x endpoint unit, tied to
+    today's most_active_stocks.json snapshot (stale or corrupted files do not count).
+
     Returns:
         str: Task ID to branch to based on existing files
-            - "extract_most_active_stocks" if most_active_stocks.json doesn't exist
-            - "price_top3_most_active_stocks" if only most_active_stocks.json exists
-            - "news_top3_most_active_stocks" if most_active + all price files exist
-            - "biz_info_top3_most_active_stocks" if most_active + price + all news files exist
+            - "extract_most_active_stocks" if most_active_stocks.json is missing or any unit is pending
+              (the per-ticker tasks skip units whose checkpoint is complete)
             - "skip_extraction" if all files exist
     """
-    client = _connect_database()
+    storage = get_storage()
     prefix_name = pendulum.today('America/New_York').to_date_string()
     prefix = f"{prefix_name}/"
 
     try:
-        if hasattr(client, "list_objects"):
-            objs = client.list_objects(BUCKET_NAME, prefix=prefix, recursive=True)
-            json_keys = [obj.object_name for obj in objs if obj.object_name.endswith(".json")]
-        else:
-            blobs = client.list_blobs(BUCKET_NAME, prefix=prefix)
-            json_keys = [blob.name for blob in blobs if blob.name.endswith(".json")]
-        
+        json_keys = storage.list_names(BUCKET_NAME, prefix=prefix, suffix=".json")
         logging.info(f"Found {len(json_keys)} JSON files in {prefix}: {json_keys}")
     except Exception as exc:
         logging.exception("Failed to list objects for bucket=%s, prefix=%s", BUCKET_NAME, prefix)
@@ -140,36 +109,21 @@ def check_files_exist_in_folder():
 
     # Check for most_active_stocks.json
     most_active_file = f"{prefix_name}/most_active_stocks.json"
-    has_most_active = most_active_file in json_keys
-    
-    if not has_most_active:
+    if most_active_file not in json_keys:
         logging.info("most_active_stocks.json does not exist. Starting from extract_most_active_stocks.")
         return "extract_most_active_stocks"
-    
-    # Check for price files (expecting 3 files with pattern *_stocks_price.json)
-    price_files = [f for f in json_keys if '/price/' in f and f.endswith('_stocks_price.json')]
-    has_all_price = len(price_files) >= 3
-    
-    if not has_all_price:
-        logging.info(f"Found {len(price_files)} price files. Starting from price_top3_most_active_stocks.")
-        return "price_top3_most_active_stocks"
-    
-    # Check for news files (expecting 3 files with pattern *_stocks_news.json)
-    news_files = [f for f in json_keys if '/news/' in f and f.endswith('_stocks_news.json')]
-    has_all_news = len(news_files) >= 3
-    
-    if not has_all_news:
-        logging.info(f"Found {len(news_files)} news files. Starting from news_top3_most_active_stocks.")
-        return "news_top3_most_active_stocks"
-    
-    # Check for business_info files (expecting 3 files with pattern *_stocks_business_info.json)
-    biz_files = [f for f in json_keys if '/business_info/' in f and f.endswith('_stocks_business_info.json')]
-    has_all_biz = len(biz_files) >= 3
-    
-    if not has_all_biz:
-        logging.info(f"Found {len(biz_files)} business_info files. Starting from biz_info_top3_most_active_stocks.")
-        return "biz_info_top3_most_active_stocks"
-    
+
+    most_active_stocks = _read_most_active_from_storage(storage, BUCKET_NAME, prefix_name)
+    if not most_active_stocks:
+        logging.info("most_active_stocks.json is empty or unreadable. Starting from extract_most_active_stocks.")
+        return "extract_most_active_stocks"
+
+    # One checkpoint per ticker x endpoint, tied to this most_active_stocks.json snapshot
+    pending = pending_units(storage, BUCKET_NAME, prefix_name, most_active_stocks)
+    if pending:
+        logging.info(f"{len(pending)} units pending: {[(e, s['symbol']) for e, s in pending]}. Starting from extract_most_active_stocks.")
+        return "extract_most_active_stocks"
+
     # All files exist, skip extraction
     logging.info("All extraction files exist. Skipping extraction group.")
     return "skip_extraction"
@@ -0,0 +1,387 @@
+import logging
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from psycopg2.extras import execute_values
+from psycopg2 import sql
+from airflow.providers.postgres.hooks.postgres import PostgresHook
+
+
+# Constants
+RAW_TABLE_NAME = "raw_most_active_stocks"
+INDICATORS_TABLE_NAME = "int_indicators"
+STATE_TABLE_NAME = "int_indicators_state"
+
+SMA_WINDOWS = (20, 50, 200)
+EMA_WINDOWS = (20, 50, 200)
+RSI_PERIOD = 14
+ATR_PERIOD = 14
+BOLLINGER_WINDOW = 20
+BOLLINGER_STD = 2
+VOLUME_Z_WINDOW = 20
+
+# Bars before the last computed date needed to fill the longest rolling window
+LOOKBACK_BARS = max(SMA_WINDOWS + (BOLLINGER_WINDOW, VOLUME_Z_WINDOW)) - 1
+# Calendar days spanning LOOKBACK_BARS trading days, with room for market holidays
+LOOKBACK_DAYS = LOOKBACK_BARS * 7 // 5 + 14
+# Block length for the closed-form EMA; keeps (1 - alpha) ** -n far from overflow
+EMA_BLOCK = 256
+
+INDICATOR_COLUMNS = [
+    "symbol", "price_date", "close_price",
+    "sma_20", "sma_50", "sma_200",
+    "ema_20", "ema_50", "ema_200",
+    "rsi_14", "atr_14",
+    "bb_middle", "bb_upper", "bb_lower",
+    "volume_zscore_20",
+]
+
+STATE_COLUMNS = [
+    "symbol", "last_price_date", "last_close",
+    "ema_20", "ema_50", "ema_200",
+    "rsi_avg_gain", "rsi_avg_loss", "atr_14",
+]
+
+
+def _ensure_tables(cur):
+    """Ensure the indicator and EMA-state tables exist in Postgres."""
+    cur.execute(
+        sql.SQL("""
+            CREATE TABLE IF NOT EXISTS {} (
+                symbol TEXT,
+                price_date DATE,
+                close_price NUMERIC,
+                sma_20 NUMERIC, sma_50 NUMERIC, sma_200 NUMERIC,
+                ema_20 NUMERIC, ema_50 NUMERIC, ema_200 NUMERIC,
+                rsi_14 NUMERIC, atr_14 NUMERIC,
+                bb_middle NUMERIC, bb_upper NUMERIC, bb_lower NUMERIC,
+                volume_zscore_20 NUMERIC,
+                PRIMARY KEY (symbol, price_date)
+            );
+        """).format(sql.Identifier(INDICATORS_TABLE_NAME))
+    )
+    cur.execute(
+        sql.SQL("""
+            CREATE TABLE IF NOT EXISTS {} (
+                symbol TEXT PRIMARY KEY,
+                last_price_date DATE,
+                last_close DOUBLE PRECISION,
+                ema_20 DOUBLE PRECISION, ema_50 DOUBLE PRECISION, ema_200 DOUBLE PRECISION,
+                rsi_avg_gain DOUBLE PRECISION, rsi_avg_loss DOUBLE PRECISION,
+                atr_14 DOUBLE PRECISION
+            );
+        """).format(sql.Identifier(STATE_TABLE_NAME))
+    )
+
+
+def _read_bars(cur, full_refresh=False):
+    """
+    Read de-duplicated daily bars for every symbol in one pass, ordered by symbol and date.
+    Each extraction day stores a compact (100 bar) TIME_SERIES_DAILY per ticker, so the same
+    bar appears many times; the most recent extraction wins.
+    Unless full_refresh, only bars after the stored state plus LOOKBACK_BARS of history are read.
+    A bar can only appear in extractions made on or after its own date, so raw rows extracted
+    before the oldest stored state minus LOOKBACK_DAYS are not unnested at all.
+    Returns:
+        list[tuple]: (symbol, price_date, open, high, low, close, volume, is_new)
+    """
+    cur.execute(
+        sql.SQL("""
+            WITH raw_rows AS (
+                SELECT date, price1, price2, price3
+                FROM {raw}
+                WHERE %(full_refresh)s
+                   OR date >= COALESCE(
+                        (SELECT min(last_price_date) FROM {state}) - %(lookback_days)s,
+                        '-infinity'::date
+                   )
+            ),
+            unioned AS (
+                SELECT date, price1 AS pj FROM raw_rows
+                UNION ALL SELECT date, price2 FROM raw_rows
+                UNION ALL SELECT date, price3 FROM raw_rows
+            ),
+            bars AS (
+                SELECT DISTINCT ON (symbol, price_date)
+                    u.pj -> 'Meta Data' ->> '2. Symbol' AS symbol,
+                    ts.key::date AS price_date,
+                    (ts.value ->> '1. open')::float8   AS open_price,
+                    (ts.value ->> '2. high')::float8   AS high_price,
+                    (ts.value ->> '3. low')::float8    AS low_price,
+                    (ts.value ->> '4. close')::float8  AS close_price,
+                    (ts.value ->> '5. volume')::float8 AS volume
+                FROM unioned u
+                CROSS JOIN LATERAL jsonb_each(u.pj -> 'Time Series (Daily)') AS ts(key, value)
+                WHERE u.pj IS NOT NULL
+                ORDER BY symbol, price_date, u.date DESC
+            ),
+            flagged AS (
+                SELECT
+                    b.*,
+                    (%(full_refresh)s OR s.last_price_date IS NULL OR b.price_date > s.last_price_date) AS is_new,
+                    ROW_NUMBER() OVER (PARTITION BY b.symbol ORDER BY b.price_date DESC) AS rn_desc,
+                    COUNT(*) FILTER (WHERE s.last_price_date IS NULL OR b.price_date > s.last_price_date)
+                        OVER (PARTITION BY b.symbol) AS new_count
+                FROM bars b
+                LEFT JOIN {state} s ON s.symbol = b.symbol
+            )
+            SELECT symbol, price_date, open_price, high_price, low_price, close_price, volume, is_new
+            FROM flagged
+            WHERE %(full_refresh)s OR rn_desc <= new_count + %(lookback)s
+            ORDER BY symbol, price_date;
+        """).format(raw=sql.Identifier(RAW_TABLE_NAME), state=sql.Identifier(STATE_TABLE_NAME)),
+        {"full_refresh": full_refresh, "lookback": LOOKBACK_BARS, "lookback_days": LOOKBACK_DAYS},
+    )
+    return cur.fetchall()
+
+
+def _read_state(cur):
+    """Load carried-forward EMA/RSI/ATR state keyed by symbol."""
+    cur.execute(
+        sql.SQL("SELECT {} FROM {};").format(
+            sql.SQL(", ").join(map(sql.Identifier, STATE_COLUMNS)),
+            sql.Identifier(STATE_TABLE_NAME),
+        )
+    )
+    return {row[0]: dict(zip(STATE_COLUMNS, row)) for row in cur.fetchall()}
+
+
+def ema(x, alpha, seed=None):
+    """
+    Vectorized exponential moving average, y[t] = alpha * x[t] + (1 - alpha) * y[t-1].
+    Uses the closed form per block of EMA_BLOCK values, carrying the last value between blocks.
+    Args:
+        x (np.ndarray): input series (float64)
+        alpha (float): smoothing factor in (0, 1]
+        seed (float, optional): y[-1] carried over from a previous run. Defaults to x[0].
+    """
+    x = np.asarray(x, dtype=np.float64)
+    out = np.empty_like(x)
+    if x.size == 0:
+        return out
+    prev = x[0] if seed is None or np.isnan(seed) else seed
+    decay = 1.0 - alpha
+    for start in range(0, x.size, EMA_BLOCK):
+        block = x[start:start + EMA_BLOCK]
+        powers = decay ** np.arange(1, block.size + 1)
+        # y[k] = decay^(k+1) * prev + alpha * sum_j decay^(k-j) * x[j]
+        out[start:start + block.size] = powers * prev + alpha * powers * np.cumsum(block / powers)
+        prev = out[start + block.size - 1]
+    return out
+
+
+def wilder(x, period, seed=None):
+    """
+    Wilder smoothing, an EMA with alpha = 1 / period.
+    Without a seed it starts like standard RSI/ATR: the value at index period - 1 is the simple
+    average of the first `period` inputs and earlier values are NaN.
+    Args:
+        x (np.ndarray): input series (float64)
+        period (int): smoothing period
+        seed (float, optional): value before x[0] carried over from a previous run
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if seed is not None and not np.isnan(seed):
+        return ema(x, 1.0 / period, seed)
+    out = np.full(x.size, np.nan)
+    if x.size < period:
+        return out
+    out[period - 1] = x[:period].mean()
+    out[period:] = ema(x[period:], 1.0 / period, out[period - 1])
+    return out
+
+
+def _warmed_up(state):
+    """True once the stored RSI and ATR averages exist, i.e. their SMA seed has been reached."""
+    return all(
+        state.get(c) is not None and not np.isnan(state[c])
+        for c in ("rsi_avg_gain", "rsi_avg_loss", "atr_14")
+    )
+
+
+def _rolling(x, window):
+    """Trailing windows of x, NaN-padded so row t holds x[t-window+1 : t+1]."""
+    padded = np.concatenate([np.full(window - 1, np.nan), x])
+    return sliding_window_view(padded, window)
+
+
+def compute_symbol_indicators(high, low, close, volume, state=None):
+    """
+    Compute indicators for one symbol's bars (oldest first).
+    Args:
+        high, low, close, volume (np.ndarray): bar columns, including any lookback history
+        state (dict, optional): carried-forward values for the bar before the first *new* bar.
+            When given, EMA/RSI/ATR recursion starts from it at `state['start']`. Without it,
+            RSI and ATR are seeded with the 14-period simple average (Wilder), so they are
+            NaN for the first bars.
+    Returns:
+        tuple[dict, dict]: (indicator columns as arrays, new state for the last bar)
+    """
+    n = close.size
+    start = state["start"] if state else 0
+    out = {}
+
+    for window in SMA_WINDOWS:
+        out[f"sma_{window}"] = _rolling(close, window).mean(axis=1)
+
+    bb_windows = _rolling(close, BOLLINGER_WINDOW)
+    bb_mid = bb_windows.mean(axis=1)
+    bb_std = bb_windows.std(axis=1)
+    out["bb_middle"] = bb_mid
+    out["bb_upper"] = bb_mid + BOLLINGER_STD * bb_std
+    out["bb_lower"] = bb_mid - BOLLINGER_STD * bb_std
+
+    vol_windows = _rolling(volume, VOLUME_Z_WINDOW)
+    vol_std = vol_windows.std(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["volume_zscore_20"] = np.where(vol_std > 0, (volume - vol_windows.mean(axis=1)) / vol_std, np.nan)
+
+    # Recursive indicators only run over the new bars, seeded from stored state
+    new_close = close[start:]
+    prev_close = np.concatenate([[state["last_close"] if state else np.nan], new_close[:-1]])
+    seed = state or {}
+
+    for window in EMA_WINDOWS:
+        col = np.full(n, np.nan)
+        col[start:] = ema(new_close, 2.0 / (window + 1), seed.get(f"ema_{window}"))
+        out[f"ema_{window}"] = col
+
+    delta = new_close - prev_close
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+    valid = ~np.isnan(delta)
+    avg_gain = np.full(new_close.size, np.nan)
+    avg_loss = np.full(new_close.size, np.nan)
+    avg_gain[valid] = wilder(gains[valid], RSI_PERIOD, seed.get("rsi_avg_gain"))
+    avg_loss[valid] = wilder(losses[valid], RSI_PERIOD, seed.get("rsi_avg_loss"))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(avg_loss > 0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss), 100.0)
+    rsi[np.isnan(avg_gain) | np.isnan(avg_loss)] = np.nan
+    out["rsi_14"] = np.concatenate([np.full(start, np.nan), rsi])
+
+    new_high, new_low = high[start:], low[start:]
+    true_range = np.nanmax(
+        np.vstack([new_high - new_low, np.abs(new_high - prev_close), np.abs(new_low - prev_close)]),
+        axis=0,
+    )
+    out["atr_14"] = np.concatenate([np.full(start, np.nan), wilder(true_range, ATR_PERIOD, seed.get("atr_14"))])
+
+    new_state = {
+        "last_close": float(close[-1]),
+        **{f"ema_{w}": float(out[f"ema_{w}"][-1]) for w in EMA_WINDOWS},
+        "rsi_avg_gain": float(avg_gain[-1]) if avg_gain.size else seed.get("rsi_avg_gain"),
+        "rsi_avg_loss": float(avg_loss[-1]) if avg_loss.size else seed.get("rsi_avg_loss"),
+        "atr_14": float(out["atr_14"][-1]),
+    }
+    return out, new_state
+
+
+def _to_db(value):
+    """NaN/inf -> NULL, numpy scalars -> Python floats."""
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def upsert_indicators(cur, full_refresh=False):
+    """
+    Compute indicators for new bars and upsert them (and the carried-forward state) with the given cursor.
+    Args:
+        cur: psycopg2 cursor; the caller owns the transaction.
+        full_refresh (bool): Recompute every bar and reset carried-forward state. Defaults to False.
+    Returns:
+        int: number of indicator rows written
+    """
+    _ensure_tables(cur)
+    rows = _read_bars(cur, full_refresh=full_refresh)
+    states = {} if full_refresh else _read_state(cur)
+    logging.info(f"Read {len(rows)} price bars")
+
+    if not rows:
+        return 0
+
+    # Columnar view of the result set
+    symbols, price_dates, _, high, low, close, volume, is_new = (np.asarray(c) for c in zip(*rows))
+    high, low, close, volume = (c.astype(np.float64) for c in (high, low, close, volume))
+    is_new = is_new.astype(bool)
+    bounds = np.flatnonzero(symbols[1:] != symbols[:-1]) + 1
+    starts = np.concatenate([[0], bounds])
+    ends = np.concatenate([bounds, [symbols.size]])
+
+    indicator_rows, state_rows = [], []
+    for lo, hi in zip(starts, ends):
+        symbol = symbols[lo]
+        new_idx = np.flatnonzero(is_new[lo:hi])
+        if new_idx.size == 0:
+            continue
+        first_new = int(new_idx[0])
+        state = states.get(symbol)
+        # A symbol still in its RSI/ATR warm-up has fewer bars than the lookback, so all of
+        # them were read: recompute from the first one instead of carrying NaN averages
+        state = {**state, "start": first_new} if state and _warmed_up(state) else None
+
+        out, new_state = compute_symbol_indicators(
+            high[lo:hi], low[lo:hi], close[lo:hi], volume[lo:hi], state
+        )
+        for i in range(first_new, hi - lo):
+            indicator_rows.append(
+                [symbol, price_dates[lo + i], _to_db(close[lo + i])]
+                + [_to_db(out[c][i]) for c in INDICATOR_COLUMNS[3:]]
+            )
+        state_rows.append(
+            [symbol, price_dates[hi - 1]] + [new_state[c] for c in STATE_COLUMNS[2:]]
+        )
+
+    execute_values(
+        cur,
+        sql.SQL("""
+            INSERT INTO {} ({}) VALUES %s
+            ON CONFLICT (symbol, price_date) DO UPDATE SET {}
+        """).format(
+            sql.Identifier(INDICATORS_TABLE_NAME),
+            sql.SQL(", ").join(map(sql.Identifier, INDICATOR_COLUMNS)),
+            sql.SQL(", ").join([
+                sql.SQL("{} = EXCLUDED.{}").format(sql.Identifier(c), sql.Identifier(c))
+                for c in INDICATOR_COLUMNS[2:]
+            ]),
+        ),
+        indicator_rows,
+        page_size=1000,
+    )
+    execute_values(
+        cur,
+        sql.SQL("""
+            INSERT INTO {} ({}) VALUES %s
+            ON CONFLICT (symbol) DO UPDATE SET {}
+        """).format(
+            sql.Identifier(STATE_TABLE_NAME),
+            sql.SQL(", ").join(map(sql.Identifier, STATE_COLUMNS)),
+            sql.SQL(", ").join([
+                sql.SQL("{} = EXCLUDED.{}").format(sql.Identifier(c), sql.Identifier(c))
+                for c in STATE_COLUMNS[1:]
+            ]),
+        ),
+        state_rows,
+    )
+    logging.info(f"Upserted {len(indicator_rows)} rows into {INDICATORS_TABLE_NAME} for {len(state_rows)} symbols")
+
+    return len(indicator_rows)
+
+
+def compute_indicators(full_refresh=False, **kwargs):
+    """
+    Compute technical indicators per symbol from the raw price bars and upsert them into int_indicators.
+    Args:
+        full_refresh (bool): Recompute every bar and reset carried-forward state. Defaults to False.
+    Returns:
+        dict: {"table": "int_indicators", "dates": [ds] if any row was written}
+    """
+    logging.info("Starting compute_indicators task execution")
+    prefix_name = kwargs.get('ds')
+
+    postgres_hook = PostgresHook(postgres_conn_id="postgres_stock")
+
+    with postgres_hook.get_conn() as conn:
+        logging.info("Postgres connection established")
+        with conn.cursor() as cur:
+            written = upsert_indicators(cur, full_refresh=full_refresh)
+
+    return {"table": INDICATORS_TABLE_NAME, "dates": [prefix_name] if written and prefix_name else []}
@@ -0,0 +1,23 @@
+from typing import TypedDict
+
+# XCom contract of the extraction group. Only references travel through XCom (the day folder,
+# the snapshot id and the ordered tickers); payloads stay in the bronze bucket.
+
+
+class TickerUnit(TypedDict):
+    """One top-N ticker, as returned (in rank order) by extract_most_active_stocks."""
+    rank: int
+    symbol: str
+    snapshot: str         # snapshot_id() of most_active_stocks.json
+    bucket: str           # e.g. 'bronze'
+    folder: str           # day folder, e.g. '2026-10-19'
+
+
+class ExtractionUnit(TypedDict):
+    """Everything one ticker x endpoint extraction needs, derived from a TickerUnit in the task."""
+    rank: int
+    symbol: str
+    snapshot: str
+    bucket: str
+    object_key: str       # payload object
+    checkpoint_key: str   # checkpoint object
@@ -0,0 +1,125 @@
+import logging
+from airflow.exceptions import AirflowSkipException
+from airflow.utils.state import TaskInstanceState
+
+# Task that publishes the dbt model selection (inside the dbt_run task group)
+PLAN_TASK_ID = "dbt_run.plan_dbt_selection"
+
+# Tasks that report which source tables/dates changed
+LOADER_TASK_IDS = [
+    "Loading_to_DB.load_data_to_db",
+    "Loading_to_DB.load_ranked_lists",
+    "Indicators.compute_indicators",
+]
+
+
+def _node_name(unique_id):
+    """'model.my_project.stg_price' -> 'stg_price', 'source.my_project.stocks_db.raw_x' -> 'raw_x'"""
+    return unique_id.split(".")[-1]
+
+
+def model_lineage(nodes):
+    """
+    Map every dbt model to the raw source tables it reads from, directly or through upstream models.
+    Args:
+        nodes (dict): unique_id -> node with a `depends_on` list, e.g. the cosmos `DbtGraph.nodes`.
+    Returns:
+        dict: model name -> sorted list of source table names (lists keep it XCom/serialization friendly)
+    """
+    cache = {}
+
+    def sources_of(unique_id):
+        if unique_id.startswith("source."):
+            return {_node_name(unique_id)}
+        if unique_id in cache:
+            return cache[unique_id]
+        cache[unique_id] = set()  # guard against cycles
+        node = nodes.get(unique_id)
+        found = set()
+        for parent in getattr(node, "depends_on", None) or []:
+            found |= sources_of(parent)
+        cache[unique_id] = found
+        return found
+
+    return {
+        _node_name(uid): sorted(sources_of(uid))
+        for uid in nodes
+        if uid.startswith("model.")
+    }
+
+
+def changed_tables(loader_results):
+    """
+    Collapse loader return values into {table: [dates]}, keeping only tables with changes.
+    Args:
+        loader_results (list): values returned by the loaders (None entries are ignored).
+    """
+    changes = {}
+    for result in loader_results:
+        if not result or not result.get("dates"):
+            continue
+        changes.setdefault(result["table"], set()).update(result["dates"])
+    return {table: sorted(dates) for table, dates in changes.items()}
+
+
+def select_models(changes, lineage):
+    """
+    Select models affected by the changed tables. Descendants are included because
+    lineage is transitive: a mart reading from a staging model inherits its sources.
+    Returns:
+        list: sorted model names to run (empty list means nothing to do)
+    """
+    tables = set(changes)
+    return sorted(model for model, sources in lineage.items() if tables.intersection(sources))
+
+
+def plan_dbt_selection(lineage, **context):
+    """
+    Read loader results from XCom and decide which dbt models need to run.
+    Returns:
+        dict: {"models": [...], "changes": {table: [dates]}}; "models" is empty when nothing
+        needs to run, so the dbt tasks always find an explicit plan.
+    """
+    loader_results = [
+        context['ti'].xcom_pull(task_ids=task_id) for task_id in LOADER_TASK_IDS
+    ]
+    changes = changed_tables(loader_results)
+
+    if not changes:
+        logging.info("No raw table changed since the last load. Skipping dbt run.")
+        return {"models": [], "changes": {}}
+
+    models = select_models(changes, lineage)
+    if not models:
+        logging.info(f"Changed tables {sorted(changes)} feed no dbt model. Skipping dbt run.")
+        return {"models": [], "changes": changes}
+
+    logging.info(f"Changed tables: {changes}. Selected dbt models: {models}")
+    return {"models": models, "changes": changes}
+
+
+def skip_unselected_model(context):
+    """
+    `pre_execute` hook for cosmos dbt tasks: skip the task if its model was not selected.
+    Task ids look like 'dbt_run.dbt_transform_data.<model>.run' or '<model>_run'.
+    Skips when the plan task did not succeed (holidays, upstream skips) or selected nothing.
+    Runs everything only if the plan task succeeded but its plan is gone (e.g. XComs cleared by hand).
+    """
+    ti = context['ti']
+    states = ti.get_task_states(dag_id=ti.dag_id, task_ids=[PLAN_TASK_ID], run_ids=[ti.run_id])
+    plan_state = states.get(ti.run_id, {}).get(PLAN_TASK_ID)
+    if plan_state != TaskInstanceState.SUCCESS:
+        raise AirflowSkipException(f"{PLAN_TASK_ID} did not succeed ({plan_state}); nothing to run.")
+
+    plan = ti.xcom_pull(task_ids=PLAN_TASK_ID)
+    if plan is None:
+        logging.warning(f"{PLAN_TASK_ID} succeeded but its plan is missing. Running {context['task'].task_id}.")
+        return
+
+    selected = set(plan.get("models", []))
+    parts = context['task'].task_id.split(".")
+    candidates = set(parts) | {p.rsplit("_", 1)[0] for p in parts}
+    if candidates & selected:
+        return
+
+    raise AirflowSkipException(f"{context['task'].task_id} is not downstream of any changed table.")
@@ -1,275 +1,312 @@
 import json
+import hashlib
 import requests
 import logging
+import pendulum
 from airflow.sdk.bases.hook import BaseHook
 from airflow.exceptions import AirflowException
-from include.connection.connect_database import _connect_database
-import time
-import io
-
-def _read_most_active_from_storage(client, bucket_name, folder_name):
-    """Helper to read most_active_stocks.json from storage when XCom is missing."""
-    object_name = f'{folder_name}/most_active_stocks.json'
-    try:
-        if hasattr(client, "get_object"):
-            response = client.get_object(bucket_name, object_name)
-            data = response.read()
-            response.close()
-            response.release_conn()
-            return json.loads(data)
-        else:
-            bucket = client.bucket(bucket_name)
-            blob = bucket.blob(object_name)
-            if blob.exists():
-                data = blob.download_as_text()
-                return json.loads(data)
-    except Exception as e:
-        logging.warning(f"Failed to read {object_name} from storage: {e}")
-    return None
-
-def extract_most_active_stocks(folder_path, **context):
-    """Extract most active stocks from Alpha Vantage API and store in GCS"""
-    logging.info("Extracting most active stocks data from API.")
-
-    bucket_name = folder_path.split('/')[0]
-    folder_name = folder_path.split('/')[1]
-    
+from include.connection.storage import ObjectNotFoundError, get_storage
+from include.tasks.contracts import ExtractionUnit, TickerUnit
+
+# Number of most active tickers to extract per day
+TOP_N = 3
+
+# Per-ticker endpoints: API function, ticker parameter name, object name suffix
+# and a key every valid payload must contain
+ENDPOINTS = {
+    "price": {"function": "TIME_SERIES_DAILY", "param": "symbol", "suffix": "stocks_price", "required_key": "Time Series (Daily)"},
+    "news": {"function": "NEWS_SENTIMENT", "param": "tickers", "suffix": "stocks_news", "required_key": "feed"},
+    "business_info": {"function": "OVERVIEW", "param": "symbol", "suffix": "stocks_business_info", "required_key": "Symbol"},
+}
+
+# TOP_GAINERS_LOSERS returns three ranked lists; all of them are kept in <day>/ranked_lists.json
+RANKED_LIST_TYPES = ("top_gainers", "top_losers", "most_actively_traded")
+RANKED_LISTS_FILE = "ranked_lists.json"
+
+# Per ticker x endpoint checkpoint records live next to the day's data. The suffix is not
+# .json so loaders and the file checks never mistake them for payloads.
+CHECKPOINT_FOLDER = "_checkpoints"
+CHECKPOINT_SUFFIX = ".checkpoint"
+
+# Incremental news: per-ticker fetch window state, outside the day folders (not compacted).
+# NEWS_SENTIMENT's time_from has minute resolution (YYYYMMDDTHHMM).
+NEWS_STATE_FOLDER = "_state/news"
+NEWS_TIME_FROM_LENGTH = len("YYYYMMDDTHHMM")
+
+# Alpha Vantage signals throttling with HTTP 200 and a "Note"/"Information" message instead of data
+THROTTLE_KEYS = ("Note", "Information")
+THROTTLE_RETRY_AFTER_SECONDS = 60
+
+class ApiThrottled(AirflowException):
+    """Raised when Alpha Vantage rejects a request because the rate limit or quota is exhausted."""
+
+    def __init__(self, message, retry_after=THROTTLE_RETRY_AFTER_SECONDS):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def _call_api(params):
+    """
+    Call the Alpha Vantage API and return the JSON payload.
+    Raises:
+        ApiThrottled: on HTTP 429 or a rate-limit message in the body (caller decides how to wait)
+        requests.exceptions.RequestException: on any other HTTP or network error
+    """
     api = BaseHook.get_connection('stock_api')
-    url = f'{api.host}'
-    
-    try:
-        response = requests.get(
-            url,
-            params={'function': 'TOP_GAINERS_LOSERS', 
-                    'apikey': api.password},
-            timeout=10
+    response = requests.get(
+        f'{api.host}',
+        params={**params, 'apikey': api.password},
+        timeout=10
+    )
+    if response.status_code == 429:
+        retry_after = response.headers.get("Retry-After")
+        raise ApiThrottled(
+            f"{params.get('function')} throttled (HTTP 429)",
+            retry_after=int(retry_after) if retry_after and retry_after.isdigit() else THROTTLE_RETRY_AFTER_SECONDS,
         )
-        response.raise_for_status()
-        logging.info("Successfully retrieved most active stocks data.")
-        
-        most_active_stocks = response.json()
-        most_active_stocks = most_active_stocks.get('most_actively_traded', [])
-        context['ti'].xcom_push(key='most_active_stocks', value=most_active_stocks)
-        
-        
-        client = _connect_database()
-        data = json.dumps(most_active_stocks, ensure_ascii=False)
-
-        object_name = f'{folder_name}/most_active_stocks.json'
-        
-        if hasattr(client, "put_object"):
-            client.put_object(
-                bucket_name,
-                object_name,
-                io.BytesIO(data.encode("utf-8")),
-                len(data.encode("utf-8")),
-                content_type="application/json",
-            )
-        else:
-            bucket = client.bucket(bucket_name)
-            blob = bucket.blob(object_name)
-            blob.upload_from_string(data, content_type='application/json')
-
-        logging.info(f"Stored most active stocks data at {bucket_name}/{object_name}")
-        return f"{bucket_name}/{object_name}"
-
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Failed to extract most active stocks data: {e}")
-        raise AirflowException("Most active stocks API request failed.")
-    
-def extract_price_top3_most_active_stocks(file_path, **context):
-    """Extract price data for top 3 most active stocks and store in GCS"""
-    logging.info("Extracting price data for top 3 most active stocks.")
-
-    api = BaseHook.get_connection('stock_api')
-    url = f'{api.host}'
-
+    response.raise_for_status()
+
+    payload = response.json()
+    if isinstance(payload, dict) and len(payload) == 1 and next(iter(payload)) in THROTTLE_KEYS:
+        raise ApiThrottled(f"{params.get('function')} throttled: {next(iter(payload.values()))}")
+    return payload
+
+def _read_most_active_from_storage(storage, bucket_name, folder_name):
+    """Helper to read most_active_stocks.json from storage."""
+    return storage.get_json(bucket_name, f'{folder_name}/most_active_stocks.json')
+
+def snapshot_id(most_active_stocks):
+    """Stable id of a most_active_stocks.json snapshot; checkpoints from another snapshot are stale."""
+    data = json.dumps(most_active_stocks, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:16]
+
+def ticker_units(most_active_stocks, top_n=TOP_N):
+    """The top_n tickers as mapping inputs: [{"rank": 0, "symbol": "NVDA", "snapshot": "..."}, ...]"""
+    snapshot = snapshot_id(most_active_stocks)
+    return [
+        {"rank": rank, "symbol": stock['ticker'], "snapshot": snapshot}
+        for rank, stock in enumerate(most_active_stocks[:top_n])
+    ]
+
+def unit_object_names(folder_name, endpoint, stock):
+    """(payload object name, checkpoint object name) for one ticker x endpoint unit."""
+    stem = f"{stock['rank']}_{stock['symbol']}"
+    return (
+        f"{folder_name}/{endpoint}/{stem}_{ENDPOINTS[endpoint]['suffix']}.json",
+        f"{folder_name}/{CHECKPOINT_FOLDER}/{endpoint}/{stem}{CHECKPOINT_SUFFIX}",
+    )
+
+def extraction_unit(endpoint, ticker: TickerUnit) -> ExtractionUnit:
+    """Object keys of one endpoint for a ticker returned by extract_most_active_stocks."""
+    object_key, checkpoint_key = unit_object_names(ticker['folder'], endpoint, ticker)
+    return ExtractionUnit(
+        rank=ticker['rank'],
+        symbol=ticker['symbol'],
+        snapshot=ticker['snapshot'],
+        bucket=ticker['bucket'],
+        object_key=object_key,
+        checkpoint_key=checkpoint_key,
+    )
+
+def _checkpoint_valid(storage, bucket_name, object_name, checkpoint, stock):
+    """
+    A unit is complete if its checkpoint is done, belongs to this snapshot and still matches the payload.
+    The checkpoint's checksum is the MD5 of the stored content. A matching ETag confirms it from
+    metadata; otherwise (multipart or SSE ETags, local files) the payload is read and hashed.
+    """
+    if not checkpoint or checkpoint.get("status") != "done" or checkpoint.get("snapshot") != stock.get("snapshot"):
+        return False
+    checksum = checkpoint.get("checksum")
+    stored_md5 = storage.md5(bucket_name, object_name)
+    if stored_md5 is None:
+        return False
+    if stored_md5 == checksum:
+        return True
     try:
-        client = _connect_database()
-        bucket_name = file_path.split('/')[0]
-        folder_name = file_path.split('/')[1]
-
-        # Try to get most_active_stocks from XCom with multiple possible sources
-        most_active_stocks = context['ti'].xcom_pull(key='most_active_stocks', task_ids='Extraction_from_API.extract_most_active_stocks')
-        if not most_active_stocks:
-            # Try without the group prefix
-            most_active_stocks = context['ti'].xcom_pull(key='most_active_stocks', task_ids='extract_most_active_stocks')
-        
-        if not most_active_stocks:
-            logging.info("XCom missing, attempting to read most_active_stocks.json from storage.")
-            most_active_stocks = _read_most_active_from_storage(client, bucket_name, folder_name)
-
-        if not most_active_stocks:
-            raise AirflowException("most_active_stocks XCom missing from extract_most_active_stocks")
-
-        top3_stocks = [stock['ticker'] for stock in most_active_stocks[:3]]
-        context['ti'].xcom_push(key='top3_stocks', value=top3_stocks)
-
-        for symbol in top3_stocks:
-            stock_response = requests.get(
-                url,
-                params={'function': 'TIME_SERIES_DAILY', 
-                        'symbol': symbol,
-                        'apikey': api.password},
-                timeout=10
-            )
-            stock_response.raise_for_status()
-            price_data = stock_response.json()
-
-            data = json.dumps(price_data, ensure_ascii=False)
-
-            object_name = f'{folder_name}/price/{top3_stocks.index(symbol)}_{symbol}_stocks_price.json'
-            
-            if hasattr(client, "put_object"):
-                client.put_object(
-                    bucket_name,
-                    object_name,
-                    io.BytesIO(data.encode("utf-8")),
-                    len(data.encode("utf-8")),
-                    content_type="application/json",
-                )
-            else:
-                bucket = client.bucket(bucket_name)
-                blob = bucket.blob(object_name)
-                blob.upload_from_string(data, content_type='application/json')
-
-            logging.info(f"Stored price data for {symbol} at {bucket_name}/{object_name}")
-            time.sleep(2)  # To respect API rate limits
-        return f"All price data for top 3 most active stocks stored in {bucket_name}/{folder_name}/price/"
-
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Failed to extract price data: {e}")
-        raise AirflowException("Price data API request failed.")
-    
-def extract_news_top3_most_active_stocks(**context):
-    """Extract news sentiment data for top 3 most active stocks from Alpha Vantage API and store in GCS"""
-    logging.info("News extraction for top 3 most active stocks.")
-    
-    client = _connect_database()
-
-    api = BaseHook.get_connection('stock_api')
-    url = f'{api.host}'
+        return hashlib.md5(storage.get(bucket_name, object_name)).hexdigest() == checksum
+    except ObjectNotFoundError:
+        return False
+
+def pending_units(storage, bucket_name, folder_name, most_active_stocks, top_n=TOP_N):
+    """
+    List (endpoint, stock) units of the snapshot that are missing, failed, stale or corrupted.
+    All checkpoints are fetched in one batch.
+    """
+    units = [(endpoint, stock) for endpoint in ENDPOINTS for stock in ticker_units(most_active_stocks, top_n)]
+    names = [unit_object_names(folder_name, endpoint, stock) for endpoint, stock in units]
+    checkpoints = storage.get_many(bucket_name, [checkpoint_name for _, checkpoint_name in names])
+    pending = []
+    for (endpoint, stock), (object_name, checkpoint_name) in zip(units, names):
+        raw = checkpoints.get(checkpoint_name)
+        try:
+            checkpoint = json.loads(raw) if raw else None
+        except ValueError:
+            logging.warning(f"Unreadable checkpoint {checkpoint_name}, treating the unit as pending.")
+            checkpoint = None
+        if not _checkpoint_valid(storage, bucket_name, object_name, checkpoint, stock):
+            pending.append((endpoint, stock))
+    return pending
+
+def _news_state_name(symbol):
+    return f"{NEWS_STATE_FOLDER}/{symbol}.json"
+
+def _news_window(state, folder_name):
+    """
+    (time_from, seen URLs) for a news fetch into folder_name. The window starts at the last
+    successful fetch of an earlier day; a rerun for the same day repeats that day's window.
+    """
+    if not state:
+        return None, set()
+    if state.get("folder") == folder_name:
+        return state.get("time_from"), set(state.get("seen_urls", []))
+    return state.get("next_time_from"), set(state.get("next_seen_urls", []))
+
+def dedupe_feed(payload, seen_urls=()):
+    """Drop articles whose URL was already fetched (seen_urls) or repeats within the feed."""
+    seen = set(seen_urls)
+    feed = []
+    for article in payload.get("feed", []):
+        url = article.get("url")
+        if url in seen:
+            continue
+        if url:
+            seen.add(url)
+        feed.append(article)
+    return {**payload, "items": str(len(feed)), "feed": feed}
+
+def _next_news_state(folder_name, time_from, seen_urls, payload):
+    """Window state after a successful fetch: the next day starts at the latest article's minute."""
+    feed = payload.get("feed", [])
+    latest = max((a.get("time_published", "") for a in feed), default="")
+    next_time_from = latest[:NEWS_TIME_FROM_LENGTH] or time_from
+    # Articles of the boundary minute come back with the next window; remember them to drop them
+    next_seen_urls = {
+        a["url"] for a in feed
+        if a.get("url") and next_time_from and a.get("time_published", "").startswith(next_time_from)
+    }
+    if next_time_from == time_from:
+        next_seen_urls |= seen_urls
+    return {
+        "folder": folder_name,
+        "time_from": time_from,
+        "seen_urls": sorted(seen_urls),
+        "next_time_from": next_time_from,
+        "next_seen_urls": sorted(next_seen_urls),
+        "updated_at": pendulum.now("UTC").to_iso8601_string(),
+    }
+
+def extract_most_active_stocks(folder_path, top_n=TOP_N, **context):
+    """
+    Extract most active stocks from Alpha Vantage API and store in GCS.
+    Re-uses today's most_active_stocks.json when it already exists, so a rerun costs no API call.
+    Returns:
+        list[TickerUnit]: the top_n tickers in rank order; every endpoint's mapped task expands over it
+    """
+    logging.info("Extracting most active stocks data from API.")
 
-    folder_path = context['ti'].xcom_pull(key='return_value', task_ids='Extraction_from_API.create_today_folder')
-    if not folder_path:
-        folder_path = context['ti'].xcom_pull(key='return_value', task_ids='create_today_folder')
     bucket_name = folder_path.split('/')[0]
     folder_name = folder_path.split('/')[1]
+    object_name = f'{folder_name}/most_active_stocks.json'
 
-    # Try to get top3_stocks from XCom with multiple possible sources
-    top3_stocks = context['ti'].xcom_pull(key='top3_stocks', task_ids='Extraction_from_API.price_top3_most_active_stocks')
-    if not top3_stocks:
-        # Try without the group prefix
-        top3_stocks = context['ti'].xcom_pull(key='top3_stocks', task_ids='price_top3_most_active_stocks')
-    
-    if not top3_stocks:
-        logging.info("XCom missing, attempting to derive top3 from storage.")
-        most_active_stocks = _read_most_active_from_storage(client, bucket_name, folder_name)
-        if most_active_stocks:
-            top3_stocks = [stock['ticker'] for stock in most_active_stocks[:3]]
-
-    if not top3_stocks:
-        raise AirflowException("top3_stocks XCom missing and could not be derived from storage")
-
-    try:
-        for symbol in top3_stocks:
-            response = requests.get(
-                url,
-                params={'function': 'NEWS_SENTIMENT', 
-                        'tickers': symbol,
-                        'apikey': api.password},
-                timeout=10
-            )
-            response.raise_for_status()
-            news_data = response.json()
-
-            data = json.dumps(news_data, ensure_ascii=False)
-
-            object_name = f'{folder_name}/news/{top3_stocks.index(symbol)}_{symbol}_stocks_news.json'
-            
-            if hasattr(client, "put_object"):
-                client.put_object(
-                    bucket_name,
-                    object_name,
-                    io.BytesIO(data.encode("utf-8")),
-                    len(data.encode("utf-8")),
-                    content_type="application/json",
-                )
-            else:
-                bucket = client.bucket(bucket_name)
-                blob = bucket.blob(object_name)
-                blob.upload_from_string(data, content_type='application/json')
-
-            logging.info(f"Stored news data for {symbol} at {bucket_name}/{object_name}")
-            time.sleep(2)
-        return f"All news data for top 3 most active stocks stored in {bucket_name}/{folder_name}/news/"
-    
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Failed to extract news data: {e}")
-        raise AirflowException("News data API request failed.")
-
-def extract_biz_info_top3_most_active_stocks(**context):
-    """Extract business info for top 3 most active stocks from Alpha Vantage API and store in GCS"""
-    logging.info("Business info extraction for top 3 most active stocks.")
-    
-    client = _connect_database()
-
-    api = BaseHook.get_connection('stock_api')
-    url = f'{api.host}'
-
-    folder_path = context['ti'].xcom_pull(key='return_value', task_ids='Extraction_from_API.create_today_folder')
-    if not folder_path:
-        folder_path = context['ti'].xcom_pull(key='return_value', task_ids='create_today_folder')
-    bucket_name = folder_path.split('/')[0]
-    folder_name = folder_path.split('/')[1]
+    storage = get_storage()
+    most_active_stocks = None
+    if storage.exists(bucket_name, object_name):
+        logging.info(f"{bucket_name}/{object_name} already exists, skipping API call.")
+        most_active_stocks = _read_most_active_from_storage(storage, bucket_name, folder_name)
+
+    if most_active_stocks is None:
+        try:
+            payload = _call_api({'function': 'TOP_GAINERS_LOSERS'})
+            logging.info("Successfully retrieved most active stocks data.")
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Failed to extract most active stocks data: {e}")
+            raise AirflowException("Most active stocks API request failed.")
+
+        # Gainers and losers come with the same response; keep all three lists. Stored before
+        # most_active_stocks.json, whose presence marks the call as done.
+        ranked_lists = {list_type: payload.get(list_type, []) for list_type in RANKED_LIST_TYPES}
+        ranked_lists['last_updated'] = payload.get('last_updated')
+        storage.put_json(bucket_name, f'{folder_name}/{RANKED_LISTS_FILE}', ranked_lists)
+
+        most_active_stocks = payload.get('most_actively_traded', [])
+        storage.put_json(bucket_name, object_name, most_active_stocks)
+        logging.info(f"Stored most active stocks data at {bucket_name}/{object_name}")
 
-    # Try to get top3_stocks from XCom with multiple possible sources
-    top3_stocks = context['ti'].xcom_pull(key='top3_stocks', task_ids='Extraction_from_API.price_top3_most_active_stocks')
-    if not top3_stocks:
-        # Try without the group prefix
-        top3_stocks = context['ti'].xcom_pull(key='top3_stocks', task_ids='price_top3_most_active_stocks')
-    
-    if not top3_stocks:
-        logging.info("XCom missing, attempting to derive top3 from storage.")
-        most_active_stocks = _read_most_active_from_storage(client, bucket_name, folder_name)
-        if most_active_stocks:
-            top3_stocks = [stock['ticker'] for stock in most_active_stocks[:3]]
-
-    if not top3_stocks:
-        raise AirflowException("top3_stocks XCom missing and could not be derived from storage")
+    return [
+        TickerUnit(**stock, bucket=bucket_name, folder=folder_name)
+        for stock in ticker_units(most_active_stocks, top_n)
+    ]
+
+def extract_ticker_endpoint(endpoint, unit):
+    """
+    Extract one endpoint (price, news or business_info) for one ticker and store it in object storage.
+    Progress is recorded in a checkpoint (status, attempts, payload checksum) tied to the
+    most_active_stocks.json snapshot; a valid checkpoint skips the API call, so retries only
+    fetch missing or invalid units.
+    News is fetched incrementally: time_from starts at the last successful fetch of the ticker and
+    articles already stored (by URL) are dropped before storage.
+    Throttling surfaces as ApiThrottled; AlphaVantageExtractOperator waits for it in the triggerer.
+    Args:
+        endpoint (str): key of ENDPOINTS
+        unit (TickerUnit): one item of extract_most_active_stocks()
+    Returns:
+        str: 'bucket_name/object_name' of the stored payload
+    """
+    spec = ENDPOINTS[endpoint]
+    unit = extraction_unit(endpoint, unit)
+    symbol = unit['symbol']
+    bucket_name = unit['bucket']
+    object_name, checkpoint_name = unit['object_key'], unit['checkpoint_key']
+    folder_name = object_name.split('/')[0]
+
+    storage = get_storage()
+    checkpoint = storage.get_json(bucket_name, checkpoint_name) or {}
+    if _checkpoint_valid(storage, bucket_name, object_name, checkpoint, unit):
+        logging.info(f"Checkpoint for {bucket_name}/{object_name} is complete, skipping API call.")
+        return f"{bucket_name}/{object_name}"
 
+    same_snapshot = checkpoint.get("snapshot") == unit['snapshot']
+    record = {
+        "endpoint": endpoint,
+        "symbol": symbol,
+        "rank": unit['rank'],
+        "snapshot": unit['snapshot'],
+        "object_name": object_name,
+        "attempts": (checkpoint.get("attempts", 0) if same_snapshot else 0) + 1,
+    }
+
+    params = {'function': spec['function'], spec['param']: symbol}
+    if endpoint == "news":
+        # Only articles published since the last successful fetch (Alpha Vantage reads comma-separated
+        # tickers as "mentions all of them", so a multi-ticker call cannot replace per-ticker calls)
+        news_state = storage.get_json(bucket_name, _news_state_name(symbol))
+        time_from, seen_urls = _news_window(news_state, folder_name)
+        if time_from:
+            params['time_from'] = time_from
+
+    logging.info(f"Extracting {endpoint} data for {symbol} (attempt {record['attempts']}).")
     try:
-        for symbol in top3_stocks:
-            response = requests.get(
-                url,
-                params={'function': 'OVERVIEW', 
-                        'symbol': symbol,
-                        'apikey': api.password},
-                timeout=10
-            )
-            response.raise_for_status()
-            biz_info_data = response.json()
-
-            data = json.dumps(biz_info_data, ensure_ascii=False)
-
-            object_name = f'{folder_name}/business_info/{top3_stocks.index(symbol)}_{symbol}_stocks_business_info.json'
-            
-            if hasattr(client, "put_object"):
-                client.put_object(
-                    bucket_name,
-                    object_name,
-                    io.BytesIO(data.encode("utf-8")),
-                    len(data.encode("utf-8")),
-                    content_type="application/json",
-                )
-            else:
-                bucket = client.bucket(bucket_name)
-                blob = bucket.blob(object_name)
-                blob.upload_from_string(data, content_type='application/json')
-
-            logging.info(f"Stored business info data for {symbol} at {bucket_name}/{object_name}")
-            time.sleep(2)  # To respect API rate limits
-        return f"All business info data for top 3 most active stocks stored in {bucket_name}/{folder_name}/business_info/"
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Failed to extract business info data: {e}")
-        raise AirflowException("Business info data API request failed.")
+        try:
+            payload = _call_api(params)
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Failed to extract {endpoint} data for {symbol}: {e}")
+            raise AirflowException(f"{spec['function']} API request failed for {symbol}.")
+        if not isinstance(payload, dict) or spec['required_key'] not in payload:
+            raise AirflowException(f"{spec['function']} payload for {symbol} has no '{spec['required_key']}'.")
+    except AirflowException as e:
+        status = "throttled" if isinstance(e, ApiThrottled) else "failed"
+        storage.put_json(bucket_name, checkpoint_name, {**record, "status": status, "error": str(e),
+                                                        "updated_at": pendulum.now("UTC").to_iso8601_string()})
+        raise
+
+    if endpoint == "news":
+        fetched = len(payload['feed'])
+        payload = dedupe_feed(payload, seen_urls)
+        logging.info(f"News for {symbol} since {time_from or 'the start'}: {len(payload['feed'])} new of {fetched} articles.")
+
+    checksum = storage.put_json(bucket_name, object_name, payload)
+    storage.put_json(bucket_name, checkpoint_name, {**record, "status": "done", "checksum": checksum,
+                                                    "updated_at": pendulum.now("UTC").to_iso8601_string()})
+    if endpoint == "news":
+        storage.put_json(bucket_name, _news_state_name(symbol), _next_news_state(folder_name, time_from, seen_urls, payload))
+    logging.info(f"Stored {endpoint} data for {symbol} at {bucket_name}/{object_name}")
+    return f"{bucket_name}/{object_name}"
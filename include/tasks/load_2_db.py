@@ -3,13 +3,17 @@ import json
 from psycopg2.extras import Json, execute_values
 from psycopg2 import sql
 from airflow.providers.postgres.hooks.postgres import PostgresHook
-# from airflow.providers.google.cloud.hooks.gcs import GCSHook # Uncomment if using GCS instead of MinIO
-from include.connection.connect_database import _connect_database
+from include.connection.storage import get_storage
+from include.tasks.bronze_archive import BronzeReader
+from include.tasks.extract_stock_info import (
+    ENDPOINTS, RANKED_LIST_TYPES, RANKED_LISTS_FILE, dedupe_feed, ticker_units, unit_object_names,
+)
 
 
 # Constants
 TABLE_NAME = "raw_most_active_stocks"
 BIZ_LOOKUP_TABLE_NAME = "biz_info_lookup"
+RANKED_LISTS_TABLE_NAME = "raw_ranked_lists"
 BUCKET_NAME = "bronze"
 
 def _ensure_table(cur, table_name):
@@ -25,33 +29,47 @@ def _ensure_table(cur, table_name):
         """).format(sql.Identifier(table_name))
     )
 
-def _load_json(client, bucket_name, blob_name):
-    """Load JSON from GCS or MinIO."""
-    if hasattr(client, "get_object"):
+def _load_json_batch(bronze, blob_names):
+    """
+    Fetch several JSON objects in one batch, from loose objects or monthly archives.
+    Returns {name: parsed JSON}, skipping missing or unreadable ones.
+    """
+    loaded = {}
+    for name, data in bronze.get_many(blob_names).items():
+        if data is None:
+            logging.warning(f"File {name} not found.")
+            continue
         try:
-            response = client.get_object(bucket_name, blob_name)
-            data = response.read()
-            response.close()
-            response.release_conn()
-            return json.loads(data)
-        except Exception as e:
-            logging.warning(f"Failed to read {blob_name} from MinIO: {e}")
-            return None
-
-    bucket = client.bucket(bucket_name)
-    blob = bucket.blob(blob_name)
-    
-    # Validate if file exists to prevent crash
-    if not blob.exists():
-        logging.warning(f"File {blob_name} not found.")
-        return None
-    
-    data = blob.download_as_text()
-    return json.loads(data)
+            loaded[name] = json.loads(data)
+        except ValueError as e:
+            logging.warning(f"Failed to parse {name}: {e}")
+    return loaded
+
+def _current_snapshot_keys(bronze, prefix_name, json_keys, endpoints=tuple(ENDPOINTS)):
+    """
+    Keep most_active_stocks.json, ranked_lists.json and the payloads of the current top-N
+    tickers, so files left over from an earlier ranked list of the same day are never loaded.
+    """
+    most_active_key = f"{prefix_name}/most_active_stocks.json"
+    most_active = bronze.get_json(most_active_key)
+    if most_active is None:
+        return json_keys
+
+    expected = {most_active_key, f"{prefix_name}/{RANKED_LISTS_FILE}"} | {
+        unit_object_names(prefix_name, endpoint, stock)[0]
+        for endpoint in endpoints
+        for stock in ticker_units(most_active)
+    }
+    stale = [key for key in json_keys if key not in expected]
+    if stale:
+        logging.info(f"Ignoring {len(stale)} files outside the current snapshot: {stale}")
+    return [key for key in json_keys if key in expected]
 
 def load_to_db(**kwargs):
     """
     Accepts **kwargs to get the Airflow execution date (ds).
+    Returns:
+        dict: {"table": raw table name, "dates": dates whose row actually changed}
     """
     logging.info("Starting load_to_db task execution")
     # 1. Use Airflow's date (YYYY-MM-DD)
@@ -62,11 +80,11 @@ def load_to_db(**kwargs):
         logging.error("KeyError: 'ds' not found in kwargs. Ensure **context is passed from the DAG.")
         raise
     
-    # 2. Connect to GCS (or MinIO) using Airflow's connection
-    # client = GCSHook(gcp_conn_id='google_cloud_default').get_conn()
-    # logging.info("Connected to GCS")
-    client = _connect_database()
-    logging.info("Connected to MinIO")
+    # 2. Connect to object storage (MinIO, GCS or local, see STORAGE_BACKEND)
+    storage = get_storage()
+    logging.info(f"Connected to {type(storage).__name__}")
+    # Day folders of compacted months are read from the monthly archives
+    bronze = BronzeReader(storage, BUCKET_NAME)
 
     logging.info("Connecting to Postgres...")
     postgres_hook = PostgresHook(postgres_conn_id="postgres_stock")
@@ -84,13 +102,9 @@ def load_to_db(**kwargs):
         with conn.cursor() as cur:
             
             # List files
-            if hasattr(client, "list_objects"):
-                objs = client.list_objects(BUCKET_NAME, prefix=prefix_name, recursive=True)
-                json_keys = [obj.object_name for obj in objs if obj.object_name.endswith(".json")]
-            else:
-                blobs = client.list_blobs(BUCKET_NAME, prefix=prefix_name)
-                json_keys = [blob.name for blob in blobs if blob.name.endswith(".json")]
+            json_keys = bronze.list_names(prefix=f"{prefix_name}/", suffix=".json")
             logging.info(f"Found {len(json_keys)} files for date {prefix_name}")
+            json_keys = _current_snapshot_keys(bronze, prefix_name, json_keys)
 
             _ensure_table(cur, TABLE_NAME)
 
@@ -101,9 +115,9 @@ def load_to_db(**kwargs):
                 "new1": None, "new2": None, "new3": None,
             }
 
-            # Map files (Logic looks good)
-            for key in json_keys:
-                data = _load_json(client, BUCKET_NAME, key)
+            # Map files (fetched in one batch)
+            news = {}
+            for key, data in _load_json_batch(bronze, json_keys).items():
                 if not data: continue
                 
                 if "most_active_stocks.json" in key:
@@ -111,9 +125,19 @@ def load_to_db(**kwargs):
                 elif "/price/0_" in key: cols["price1"] = Json(data)
                 elif "/price/1_" in key: cols["price2"] = Json(data)
                 elif "/price/2_" in key: cols["price3"] = Json(data)
-                elif "/news/0_" in key: cols["new1"] = Json(data)
-                elif "/news/1_" in key: cols["new2"] = Json(data)
-                elif "/news/2_" in key: cols["new3"] = Json(data)
+                elif "/news/0_" in key: news["new1"] = data
+                elif "/news/1_" in key: news["new2"] = data
+                elif "/news/2_" in key: news["new3"] = data
+
+            # An article about several top tickers is kept once, in its highest-ranked slot;
+            # stg_news still unnests it for every mentioned ticker
+            seen_urls = set()
+            for slot in ("new1", "new2", "new3"):
+                if not isinstance(news.get(slot), dict):
+                    continue
+                deduped = dedupe_feed(news[slot], seen_urls)
+                seen_urls.update(a["url"] for a in deduped["feed"] if a.get("url"))
+                cols[slot] = Json(deduped)
 
             # 3. FIXED: SQL Injection safety + UPSERT logic
             # Use DO UPDATE so re-runs fill in missing data
@@ -135,11 +159,21 @@ def load_to_db(**kwargs):
                     price3 = EXCLUDED.price3,
                     new1 = EXCLUDED.new1,
                     new2 = EXCLUDED.new2,
-                    new3 = EXCLUDED.new3;
-            """).format(sql.Identifier(TABLE_NAME))
+                    new3 = EXCLUDED.new3
+                -- Skip no-op updates so RETURNING only reports real changes
+                WHERE ({tbl}.most_active, {tbl}.price1, {tbl}.price2, {tbl}.price3,
+                       {tbl}.new1, {tbl}.new2, {tbl}.new3)
+                    IS DISTINCT FROM
+                      (EXCLUDED.most_active, EXCLUDED.price1, EXCLUDED.price2, EXCLUDED.price3,
+                       EXCLUDED.new1, EXCLUDED.new2, EXCLUDED.new3)
+                RETURNING date;
+            """).format(sql.Identifier(TABLE_NAME), tbl=sql.Identifier(TABLE_NAME))
 
             cur.execute(insert_stmt, cols)
-            logging.info(f"Upserted data for {prefix_name}")
+            changed = cur.fetchone() is not None
+            logging.info(f"Upserted data for {prefix_name} (changed: {changed})")
+
+    return {"table": TABLE_NAME, "dates": [prefix_name] if changed else []}
 
 BIZ_LOOKUP_COLUMNS = [
     "Symbol",
@@ -220,7 +254,10 @@ def _normalize_value(v):
     return v
 
 def load_2_db_biz_lookup(**kwargs):
-    """Load business info data into Postgres lookup table."""
+    """Load business info data into Postgres lookup table.
+    Returns:
+        dict: {"table": lookup table name, "dates": [ds] if any symbol actually changed}
+    """
     logging.info("Starting load_2_db_biz_lookup task execution")
     
     # 1. Use Airflow date
@@ -233,10 +270,10 @@ def load_2_db_biz_lookup(**kwargs):
 
     prefix = f"{prefix_name}/business_info"
 
-    # client = GCSHook(gcp_conn_id='google_cloud_default').get_conn()
-    # logging.info("Connected to GCS")
-    client = _connect_database()
-    logging.info("Connected to MinIO")
+    storage = get_storage()
+    logging.info(f"Connected to {type(storage).__name__}")
+    # Day folders of compacted months are read from the monthly archives
+    bronze = BronzeReader(storage, BUCKET_NAME)
 
     logging.info("Connecting to Postgres...")
     postgres_hook = PostgresHook(postgres_conn_id="postgres_stock")
@@ -252,35 +289,41 @@ def load_2_db_biz_lookup(**kwargs):
         logging.info("Postgres connection established")
         with conn.cursor() as cur:
 
-            if hasattr(client, "list_objects"):
-                objs = client.list_objects(BUCKET_NAME, prefix=prefix, recursive=True)
-                json_keys = [obj.object_name for obj in objs if obj.object_name.endswith(".json")]
-            else:
-                blobs = client.list_blobs(BUCKET_NAME, prefix=prefix)
-                json_keys = [blob.name for blob in blobs if blob.name.endswith(".json")]
+            json_keys = bronze.list_names(prefix=prefix, suffix=".json")
+            json_keys = _current_snapshot_keys(bronze, prefix_name, json_keys, endpoints=("business_info",))
 
             _ensure_lookup_table(cur, BIZ_LOOKUP_TABLE_NAME)
 
             # 2. Prepare Query
+            update_cols = [c for c in BIZ_LOOKUP_COLUMNS if c != "Symbol"]
             insert_query = sql.SQL("""
-                INSERT INTO {} ({})
+                INSERT INTO {table} ({cols})
                 VALUES %s
-                ON CONFLICT ({}) DO UPDATE SET
+                ON CONFLICT ({pk}) DO UPDATE SET
                 -- Generate 'col = EXCLUDED.col' for all columns except Symbol
-                {}
+                {updates}
+                -- Skip no-op updates so RETURNING only reports real changes
+                WHERE ({current}) IS DISTINCT FROM ({excluded})
+                RETURNING {pk}
             """).format(
-                sql.Identifier(BIZ_LOOKUP_TABLE_NAME),
-                sql.SQL(", ").join(map(sql.Identifier, BIZ_LOOKUP_COLUMNS)),
-                sql.Identifier("Symbol"),
-                sql.SQL(", ").join([
+                table=sql.Identifier(BIZ_LOOKUP_TABLE_NAME),
+                cols=sql.SQL(", ").join(map(sql.Identifier, BIZ_LOOKUP_COLUMNS)),
+                pk=sql.Identifier("Symbol"),
+                updates=sql.SQL(", ").join([
                     sql.SQL("{} = EXCLUDED.{}").format(sql.Identifier(c), sql.Identifier(c))
-                    for c in BIZ_LOOKUP_COLUMNS if c != "Symbol"
-                ])
+                    for c in update_cols
+                ]),
+                current=sql.SQL(", ").join([
+                    sql.SQL("{}.{}").format(sql.Identifier(BIZ_LOOKUP_TABLE_NAME), sql.Identifier(c))
+                    for c in update_cols
+                ]),
+                excluded=sql.SQL(", ").join([
+                    sql.SQL("EXCLUDED.{}").format(sql.Identifier(c)) for c in update_cols
+                ]),
             )
 
             def generate_records():
-                for key in json_keys:
-                    data = _load_json(client, BUCKET_NAME, key)
+                for data in _load_json_batch(bronze, json_keys).values():
                     if not data: continue
 
                     records = data if isinstance(data, list) else [data]
@@ -292,5 +335,95 @@ def load_2_db_biz_lookup(**kwargs):
 
             # 3. Execute Values
             # execute_values handles the VALUES %s expansion automatically
-            execute_values(cur, insert_query, generate_records())
-            logging.info(f"Inserted records into {BIZ_LOOKUP_TABLE_NAME}.")
+            changed_symbols = execute_values(cur, insert_query, generate_records(), fetch=True)
+            logging.info(f"Upserted records into {BIZ_LOOKUP_TABLE_NAME} (changed symbols: {[r[0] for r in changed_symbols]}).")
+
+    return {"table": BIZ_LOOKUP_TABLE_NAME, "dates": [prefix_name] if changed_symbols else []}
+
+
+def _ensure_ranked_lists_table(cur, table_name):
+    """Ensure the long-format ranked-list table exists in Postgres."""
+    cur.execute(
+        sql.SQL("""
+            CREATE TABLE IF NOT EXISTS {} (
+                date DATE NOT NULL,
+                list_type TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                ticker TEXT,
+                item JSONB,
+                PRIMARY KEY (date, list_type, rank)
+            );
+        """).format(sql.Identifier(table_name))
+    )
+
+def ranked_list_rows(date, ranked_lists):
+    """
+    Long-format rows of the TOP_GAINERS_LOSERS lists.
+    Returns:
+        list[tuple]: (date, list_type, rank starting at 1, ticker, item) per entry
+    """
+    return [
+        (date, list_type, rank, item.get("ticker"), Json(item))
+        for list_type in RANKED_LIST_TYPES
+        for rank, item in enumerate(ranked_lists.get(list_type) or [], start=1)
+    ]
+
+def load_ranked_lists(**kwargs):
+    """Load the day's top gainers, top losers and most actively traded lists into Postgres.
+    Days extracted before ranked_lists.json existed only have most_active_stocks.json,
+    which is loaded as the most_actively_traded list.
+    Returns:
+        dict: {"table": ranked-list table name, "dates": [ds] if any rank actually changed}
+    """
+    logging.info("Starting load_ranked_lists task execution")
+
+    try:
+        prefix_name = kwargs['ds']
+        logging.info(f"Processing date: {prefix_name}")
+    except KeyError:
+        logging.error("KeyError: 'ds' missing.")
+        raise
+
+    bronze = BronzeReader(get_storage(), BUCKET_NAME)
+    ranked_lists = bronze.get_json(f"{prefix_name}/{RANKED_LISTS_FILE}")
+    if ranked_lists is None:
+        most_active = bronze.get_json(f"{prefix_name}/most_active_stocks.json")
+        ranked_lists = {"most_actively_traded": most_active} if most_active is not None else {}
+        logging.info(f"{RANKED_LISTS_FILE} not found, loading lists: {list(ranked_lists)}")
+
+    rows = ranked_list_rows(prefix_name, ranked_lists)
+    postgres_hook = PostgresHook(postgres_conn_id="postgres_stock")
+
+    with postgres_hook.get_conn() as conn:
+        with conn.cursor() as cur:
+            _ensure_ranked_lists_table(cur, RANKED_LISTS_TABLE_NAME)
+
+            insert_query = sql.SQL("""
+                INSERT INTO {table} (date, list_type, rank, ticker, item)
+                VALUES %s
+                ON CONFLICT (date, list_type, rank) DO UPDATE SET
+                    ticker = EXCLUDED.ticker,
+                    item = EXCLUDED.item
+                -- Skip no-op updates so RETURNING only reports real changes
+                WHERE ({table}.ticker, {table}.item) IS DISTINCT FROM (EXCLUDED.ticker, EXCLUDED.item)
+                RETURNING list_type, rank
+            """).format(table=sql.Identifier(RANKED_LISTS_TABLE_NAME))
+            changed = execute_values(cur, insert_query, rows, fetch=True) if rows else []
+
+            # A list that got shorter on a rerun leaves ranks behind
+            removed = 0
+            for list_type in RANKED_LIST_TYPES:
+                if list_type not in ranked_lists:
+                    continue
+                cur.execute(
+                    sql.SQL("DELETE FROM {} WHERE date = %s AND list_type = %s AND rank > %s").format(
+                        sql.Identifier(RANKED_LISTS_TABLE_NAME)
+                    ),
+                    (prefix_name, list_type, len(ranked_lists[list_type] or [])),
+                )
+                removed += cur.rowcount
+
+            logging.info(f"Upserted {len(rows)} ranked-list rows into {RANKED_LISTS_TABLE_NAME} "
+                         f"(changed: {len(changed)}, removed: {removed}).")
+
+    return {"table": RANKED_LISTS_TABLE_NAME, "dates": [prefix_name] if changed or removed else []}